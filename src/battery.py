@@ -0,0 +1,117 @@
+# Battery storage model with real-time integration.
+# Energy is kept in joules and power in watts. The state follows
+#     dE/dt = eta_c * P_charge - P_discharge / eta_d - k * E
+# clamped to [0, capacity], where k is the self-discharge rate. For constant
+# power over a step the equation has an exact exponential solution, and that
+# solution is monotonic, so clamping at the end of a step is exact too. This
+# lets step() take any dt and fast_forward() cover days in one call.
+import math
+import numpy as np
+
+CHARGE_EFFICIENCY = 0.95
+DISCHARGE_EFFICIENCY = 0.95
+SELF_DISCHARGE_PER_MONTH = 0.03  # Fraction of stored energy lost per 30 days
+SECONDS_PER_MONTH = 30 * 24 * 60 * 60
+BLOCK_SIZE = 4096  # Steps per vectorized block in integrate()
+
+
+# Unclamped x[i] = decay * x[i-1] + b[i] with x[-1] = level, for a constant
+# decay in (0, 1], computed with cumulative sums in vectorized blocks
+def linear_recurrence(b, decay, level=0.0, block_size=BLOCK_SIZE):
+    b = np.asarray(b, dtype=np.float64)
+    if decay <= 0:
+        return b.copy()
+    out = np.empty(b.size)
+    if decay < 1:
+        block_size = max(1, min(block_size, int(50 / -math.log(decay))))  # Keep decay^-block in range
+    for i in range(0, b.size, block_size):
+        block = b[i:i + block_size]
+        powers = decay ** np.arange(1, block.size + 1)
+        out[i:i + block.size] = powers * (level + np.cumsum(block / powers))
+        level = out[i + block.size - 1]
+    return out
+
+
+# Self-discharge rate constant k (1/s) from a monthly loss fraction
+def self_discharge_rate(fraction_per_month):
+    return -math.log1p(-fraction_per_month) / SECONDS_PER_MONTH
+
+
+class Battery:
+    def __init__(self, capacity, level=0.0, charge_efficiency=CHARGE_EFFICIENCY,
+                 discharge_efficiency=DISCHARGE_EFFICIENCY,
+                 self_discharge_per_month=SELF_DISCHARGE_PER_MONTH):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = float(capacity)  # J
+        self.level = min(max(float(level), 0.0), self.capacity)  # J
+        self.charge_efficiency = charge_efficiency
+        self.discharge_efficiency = discharge_efficiency
+        self.k = self_discharge_rate(self_discharge_per_month)
+
+    @property
+    def fraction(self):
+        return self.level / self.capacity
+
+    # Net power reaching the cells after conversion losses, elementwise for arrays
+    def effective_power(self, power):
+        if np.ndim(power):
+            power = np.asarray(power, dtype=np.float64)
+            return np.where(power > 0, power * self.charge_efficiency, power / self.discharge_efficiency)
+        return power * self.charge_efficiency if power > 0 else power / self.discharge_efficiency
+
+    # Exact solution of the ODE for constant effective power p over dt seconds
+    def _advance(self, level, p, dt):
+        if self.k == 0:
+            return level + p * dt
+        target = p / self.k  # Level the battery would settle at
+        return target + (level - target) * math.exp(-self.k * dt)
+
+    # Advance by dt seconds with signed power in W (positive charges). Returns the new level.
+    def step(self, power, dt):
+        level = self._advance(self.level, self.effective_power(power), dt)
+        self.level = min(max(level, 0.0), self.capacity)
+        return self.level
+
+    # Closed-form jump over a long period of constant power, e.g. days of operation
+    def fast_forward(self, power, duration):
+        return self.step(power, duration)
+
+    # Integrate a whole power series sampled every dt seconds.
+    # Returns the level after each sample. Work is done in vectorized blocks;
+    # stretches where the battery sits full or empty are skipped in one go.
+    def integrate(self, power, dt):
+        p = np.atleast_1d(self.effective_power(np.asarray(power, dtype=np.float64)))
+        n = p.size
+        levels = np.empty(n)
+        decay = math.exp(-self.k * dt)
+        # Per-step increment b so that E[i+1] = decay * E[i] + b[i]
+        gain = (1 - decay) / self.k if self.k else dt
+        b = p * gain
+        level = self.level
+        i = 0
+        while i < n:
+            # Pinned at a bound: skip every step that keeps it there
+            if level >= self.capacity or level <= 0:
+                chunk = b[i:i + BLOCK_SIZE]
+                if level >= self.capacity:
+                    stay = decay * self.capacity + chunk >= self.capacity
+                else:
+                    stay = chunk <= 0
+                run = stay.size if stay.all() else int(np.argmin(stay))
+                if run:
+                    levels[i:i + run] = level
+                    i += run
+                    continue
+            unclamped = linear_recurrence(b[i:i + BLOCK_SIZE], decay, level)
+            m = unclamped.size
+            out = (unclamped > self.capacity) | (unclamped < 0)
+            if out.any():
+                m = int(np.argmax(out)) + 1
+                unclamped = unclamped[:m]
+                unclamped[-1] = min(max(unclamped[-1], 0.0), self.capacity)
+            levels[i:i + m] = unclamped
+            level = float(unclamped[-1])
+            i += m
+        self.level = level
+        return levels
@@ -0,0 +1,91 @@
+# Blitting renderer for the energy charts.
+# The static part of a figure (axes, grid, legend, title) is rendered once
+# and cached; every tick only the animated artists (the energy line and the
+# spike annotation) are redrawn on top of the cached background.
+import time
+from ring_buffer import RingBuffer
+
+
+# Rolling frame-time statistics, shared by all charts. A frame is one
+# refresh pass: the draws of every chart updated in the same pass add up.
+class FrameTimer:
+    def __init__(self, capacity=300):
+        self.samples = RingBuffer(capacity)  # Frame times in seconds
+        self.frames = 0
+        self.pending = 0.0  # Draw time of the open pass
+        self.charts = 0     # Charts drawn in the open pass
+        self.last_charts = 0
+
+    def record(self, seconds):
+        self.pending += seconds
+        self.charts += 1
+
+    # Close the open pass and count it as one frame
+    def end_pass(self):
+        if self.charts:
+            self.samples.append(self.pending)
+            self.frames += 1
+            self.last_charts = self.charts
+        self.pending = 0.0
+        self.charts = 0
+
+    # Mean frame time over the recent window in milliseconds
+    def mean_ms(self):
+        window = self.samples.window()
+        return float(window.mean()) * 1000 if len(window) else 0.0
+
+    # Slowest recent frame in milliseconds
+    def max_ms(self):
+        window = self.samples.window()
+        return float(window.max()) * 1000 if len(window) else 0.0
+
+    # Refresh passes per second the renderer could sustain at the mean frame time
+    def fps(self):
+        mean = self.mean_ms()
+        return 1000 / mean if mean else 0.0
+
+    def summary(self):
+        return (f"Render: {self.mean_ms():.1f} ms/frame, {self.last_charts} charts "
+                f"({self.fps():.0f} fps max)")
+
+
+class BlitChart:
+    def __init__(self, canvas, line, annotation=None, timer=None, blit=True):
+        self.canvas = canvas
+        self.figure = canvas.figure
+        self.line = line
+        self.annotation = annotation
+        self.timer = timer
+        self.blit = blit and canvas.supports_blit
+        self.background = None
+        self.artists = [line] if annotation is None else [line, annotation]
+        if self.blit:
+            for artist in self.artists:
+                artist.set_animated(True)
+            canvas.mpl_connect('draw_event', self._on_draw)
+
+    # Full redraws (first paint, resize, limit changes) refresh the cached background
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist in self.artists:
+            if artist.get_visible():
+                artist.axes.draw_artist(artist)
+
+    # Mark the background stale, e.g. after changing the axis limits
+    def invalidate(self):
+        self.background = None
+
+    # Redraw the chart, blitting only the animated artists when possible
+    def draw(self):
+        start = time.perf_counter()
+        if not self.blit or self.background is None:
+            self.canvas.draw()  # Triggers _on_draw, which caches the background
+        else:
+            self.canvas.restore_region(self.background)
+            self._draw_artists()
+            self.canvas.blit(self.figure.bbox)
+        if self.timer is not None:
+            self.timer.record(time.perf_counter() - start)
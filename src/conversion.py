@@ -0,0 +1,221 @@
+# Conversion chain from the plants to the battery.
+# The README path is piezoelectric sensors -> series capacitors ->
+# rectifiers -> dynamo -> battery, about 45% end to end. Each stage maps the
+# power it receives (W) to the power it passes on and keeps its own state
+# and loss counters, and a ConversionChain composes any list of stages.
+#
+# step(power, dt) advances one live step (SimulationWorker); run(power, dt)
+# converts a whole series sampled every dt seconds with array operations and
+# leaves every stage in the state the same step() calls would have, so months
+# of data can be pushed through a chain configuration in one call.
+#
+#   python conversion.py --plants 1000 --duration 90d
+import argparse
+import math
+import sys
+import time
+import numpy as np
+from battery import Battery, linear_recurrence
+
+PIEZO_EFFICIENCY = 0.75      # Mechanical leaf motion -> electrical energy
+CAPACITOR_EFFICIENCY = 0.95  # Series resistance losses while charging the bank
+CAPACITANCE = 0.01           # F, whole capacitor bank
+TRANSFER_TIME = 10.0         # Seconds, time constant of the bank draining into the rectifier
+LEAKAGE_TIME = 2e4           # Seconds, time constant of the bank's self-discharge
+RECTIFIER_VOLTAGE = 3.3      # V, operating voltage at the rectifier
+FORWARD_DROP = 0.3           # V per diode (Schottky)
+RECTIFIER_DIODES = 2         # Diodes conducting at once in a full bridge
+DYNAMO_EFFICIENCY = 0.81     # Coil and magnet AC stage
+# With the battery's 0.95 charge efficiency these give about 0.45 overall
+
+
+class Stage:
+    name = "stage"
+
+    def __init__(self, efficiency=1.0):
+        self.efficiency = efficiency
+        self.energy_in = 0.0   # J received so far
+        self.energy_out = 0.0  # J passed on so far
+
+    # J lost in this stage so far
+    @property
+    def loss(self):
+        return self.energy_in - self.energy_out
+
+    def step(self, power, dt):
+        out = power * self.efficiency
+        self.energy_in += power * dt
+        self.energy_out += out * dt
+        return out
+
+    def run(self, power, dt):
+        out = power * self.efficiency
+        self.energy_in += float(power.sum()) * dt
+        self.energy_out += float(out.sum()) * dt
+        return out
+
+
+class Piezo(Stage):
+    name = "piezo"
+
+    def __init__(self, efficiency=PIEZO_EFFICIENCY):
+        super().__init__(efficiency)
+
+
+class Dynamo(Stage):
+    name = "dynamo"
+
+    def __init__(self, efficiency=DYNAMO_EFFICIENCY):
+        super().__init__(efficiency)
+
+
+# Diode bridge: each conducting diode drops forward_drop volts, so the
+# fraction passed at the operating voltage is 1 - diodes * drop / voltage
+class Rectifier(Stage):
+    name = "rectifier"
+
+    def __init__(self, voltage=RECTIFIER_VOLTAGE, forward_drop=FORWARD_DROP, diodes=RECTIFIER_DIODES):
+        self.voltage = voltage
+        self.forward_drop = forward_drop
+        self.diodes = diodes
+        super().__init__(max(0.0, 1 - self.drop / voltage))
+
+    # Total voltage lost across the bridge
+    @property
+    def drop(self):
+        return self.diodes * self.forward_drop
+
+
+# Capacitor bank holding energy E (J) between the piezo pulses and the
+# rectifier. It charges at efficiency * P_in and drains into the next stage
+# with time constant transfer_time while leaking with leakage_time:
+#     dE/dt = efficiency * P_in - E / transfer_time - E / leakage_time
+# For constant input over a step this has an exact exponential solution, so
+# a series is one linear recurrence (battery.linear_recurrence).
+class CapacitorBank(Stage):
+    name = "capacitors"
+
+    def __init__(self, capacitance=CAPACITANCE, efficiency=CAPACITOR_EFFICIENCY, transfer_time=TRANSFER_TIME,
+                 leakage_time=LEAKAGE_TIME, energy=0.0):
+        super().__init__(efficiency)
+        self.capacitance = capacitance
+        self.transfer_time = transfer_time
+        self.leakage_time = leakage_time
+        self.energy = energy  # J stored
+        self.rate = 1 / transfer_time + 1 / leakage_time
+        self.share = (1 / transfer_time) / self.rate  # Fraction of the outflow that reaches the rectifier
+
+    @property
+    def voltage(self):
+        return math.sqrt(2 * self.energy / self.capacitance)
+
+    # Per-step decay and input gain: E' = decay * E + gain * P
+    def _coefficients(self, dt):
+        decay = math.exp(-self.rate * dt)
+        return decay, (1 - decay) / self.rate
+
+    def step(self, power, dt):
+        decay, gain = self._coefficients(dt)
+        charge = power * self.efficiency
+        energy = decay * self.energy + gain * charge
+        out = (charge * dt - (energy - self.energy)) * self.share / dt
+        self.energy = energy
+        self.energy_in += power * dt
+        self.energy_out += out * dt
+        return out
+
+    def run(self, power, dt):
+        decay, gain = self._coefficients(dt)
+        charge = power * self.efficiency
+        energy = linear_recurrence(charge * gain, decay, self.energy)
+        stored = np.diff(energy, prepend=self.energy)
+        out = (charge * dt - stored) * self.share / dt
+        if energy.size:
+            self.energy = float(energy[-1])
+        self.energy_in += float(power.sum()) * dt
+        self.energy_out += float(out.sum()) * dt
+        return out
+
+
+class ConversionChain:
+    def __init__(self, stages):
+        self.stages = list(stages)
+
+    # Nominal end-to-end efficiency of the stages in steady state
+    @property
+    def efficiency(self):
+        efficiency = 1.0
+        for stage in self.stages:
+            efficiency *= stage.efficiency * getattr(stage, "share", 1.0)
+        return efficiency
+
+    # Harvested power in W -> power delivered to the battery in W
+    def step(self, power, dt):
+        power = max(power, 0.0)
+        for stage in self.stages:
+            power = stage.step(power, dt)
+        return power
+
+    def run(self, power, dt):
+        power = np.maximum(np.asarray(power, dtype=np.float64), 0.0)
+        for stage in self.stages:
+            power = stage.run(power, dt)
+        return power
+
+    # Stage name -> J lost so far
+    def losses(self):
+        return {stage.name: stage.loss for stage in self.stages}
+
+
+# The README chain with the default stage parameters
+def default_chain():
+    return ConversionChain([Piezo(), CapacitorBank(), Rectifier(), Dynamo()])
+
+
+def parse_args(argv=None):
+    from simulate import parse_duration
+    parser = argparse.ArgumentParser(description="Push a synthetic harvest series through a conversion chain.")
+    parser.add_argument("--plants", type=int, default=1000, help="number of plants (default: 1000)")
+    parser.add_argument("--duration", type=parse_duration, default=parse_duration("30d"),
+                        help="simulated time, e.g. 3600, 15m, 24h, 90d (default: 30d)")
+    parser.add_argument("--dt", type=float, default=1.0, help="time step in seconds (default: 1)")
+    parser.add_argument("--piezo", type=float, default=PIEZO_EFFICIENCY, help="piezo efficiency")
+    parser.add_argument("--capacitance", type=float, default=CAPACITANCE, help="capacitor bank in F")
+    parser.add_argument("--voltage", type=float, default=RECTIFIER_VOLTAGE, help="rectifier operating voltage")
+    parser.add_argument("--forward-drop", type=float, default=FORWARD_DROP, help="diode forward drop in V")
+    parser.add_argument("--dynamo", type=float, default=DYNAMO_EFFICIENCY, help="dynamo efficiency")
+    parser.add_argument("--battery-capacity", type=float, default=1000.0, help="battery capacity in J")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible runs")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from plant_engine import BASELINE_ENERGY, SPIKE_ENERGY
+    args = parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+    steps = int(round(args.duration / args.dt))
+    # Resting readings of the plants: normal approximation of the uniform draws, µW -> W
+    width = SPIKE_ENERGY - BASELINE_ENERGY
+    mean = args.plants * (BASELINE_ENERGY + width / 2)
+    std = width * (args.plants / 12) ** 0.5
+    harvest = rng.normal(mean, std, steps) * 1e-6
+    chain = ConversionChain([Piezo(args.piezo), CapacitorBank(args.capacitance),
+                             Rectifier(args.voltage, args.forward_drop), Dynamo(args.dynamo)])
+    battery = Battery(args.battery_capacity)
+    started = time.perf_counter()
+    levels = battery.integrate(chain.run(harvest, args.dt), args.dt)
+    wall = time.perf_counter() - started
+    harvested = float(harvest.sum()) * args.dt
+    print(f"{'steps':>20}: {steps}")
+    print(f"{'wall_s':>20}: {wall:.6g}")
+    print(f"{'harvested_j':>20}: {harvested:.6g}")
+    for name, loss in chain.losses().items():
+        print(f"{name + '_loss_j':>20}: {loss:.6g}")
+    print(f"{'battery_final_j':>20}: {levels[-1] if steps else battery.level:.6g}")
+    print(f"{'chain_efficiency':>20}: {chain.efficiency:.4f}")
+    print(f"{'overall_efficiency':>20}: {chain.efficiency * battery.charge_efficiency:.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
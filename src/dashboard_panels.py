@@ -0,0 +1,349 @@
+# Config-driven plant panels for the dashboard.
+# Every plant group on the dashboard is one PlantPanel built from a
+# PanelConfig: chart, plant image, touch button, start/stop controls and, for
+# resizable groups, a plant count entry. All panels record into one
+# EnergyStore and are drawn by one PanelRenderer, which only renders panels
+# that are inside the scrolled viewport. Panels out of view are marked stale
+# and redrawn when they are scrolled back in, so adding panels does not add
+# rendering work. Charts (and matplotlib itself) are only built once a panel
+# is first visible. With a history_archive.HistoryArchive the renderer can
+# also scroll every chart back in time; the window is then read straight
+# from the memory-mapped archive instead of the live store. With a
+# history_pyramid.HistoryPyramid the charts can zoom out to hours or days:
+# each chart then draws the min / max envelope of the pyramid level that
+# matches its pixel width, never more than one bucket per pixel.
+import time
+import tkinter as tk
+from typing import NamedTuple
+import numpy as np
+from chart_renderer import BlitChart, FrameTimer
+from ring_buffer import TimeSeries, HISTORY_SECONDS
+
+CHART_SIZE = (640, 480)  # Pixel size of a chart panel (matplotlib's default figure)
+
+_matplotlib = None  # (Figure, FigureCanvasTkAgg) once imported
+
+
+class PanelConfig(NamedTuple):
+    key: str                 # Group name in the simulation worker
+    title: str               # Chart title
+    label: str               # Button text, e.g. "100 Plants"
+    legend: str              # Legend entry for the energy line
+    plants: int              # Plants in the group (initial count for resizable groups)
+    ylim: float              # Lowest top of the y axis in µW
+    color: str               # Line colour
+    open_image: str = None   # Image paths for the open and closed plant
+    close_image: str = None
+    annotate: bool = False   # Label the latest value while above baseline
+    resizable: bool = False  # Plant count can be edited from the panel
+    max_plants: int = 0      # Engine slots reserved for a resizable group
+
+
+# Shared context every panel needs from the dashboard
+class PanelContext(NamedTuple):
+    worker: object         # sim_worker.SimulationWorker
+    store: object          # EnergyStore
+    renderer: object       # PanelRenderer
+    scheduler: object      # scheduler.TickScheduler
+    image: object          # Path -> Tk image
+    update_interval: float  # Seconds between live samples
+    reopen_delay: float    # Seconds before a touched plant reopens
+    touch_energy: float    # Spike amplitude per plant in µW
+    baseline: float        # Baseline energy in µW
+
+
+# Group name -> (start, stop) plant slice, groups laid out back to back from
+# start. Resizable groups reserve max_plants slots so they can grow without overlap.
+def plant_groups(configs, start=0):
+    groups = {}
+    for config in configs:
+        groups[config.key] = (start, start + config.plants)
+        start += max(config.plants, config.max_plants) if config.resizable else config.plants
+    return groups
+
+
+def load_matplotlib():
+    global _matplotlib
+    if _matplotlib is None:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        _matplotlib = Figure, FigureCanvasTkAgg
+    return _matplotlib
+
+
+# One time series per panel, plus the latest value of each
+class EnergyStore:
+    def __init__(self, keys, capacity=HISTORY_SECONDS):
+        self.series = {key: TimeSeries(capacity) for key in keys}
+        self.current = dict.fromkeys(keys, 0.0)
+
+    def record(self, key, value, t=None):
+        self.current[key] = value
+        self.series[key].append(time.time() if t is None else t, value)
+
+    # Zero-copy view of the last n values of a series
+    def window(self, key, n):
+        return self.series[key].values.window(n)
+
+
+class PanelRenderer:
+    def __init__(self, root, viewport, store, window=60, blit=True, startup=None, history=None, pyramid=None):
+        self.root = root
+        self.viewport = viewport  # Scrolled canvas the panels live in
+        self.store = store
+        self.window = window      # Samples shown on each chart
+        self.blit = blit
+        self.startup = startup    # Optional startup_report.StartupTimer
+        self.history = history    # Optional history_archive.HistoryArchive with energy_<key> columns
+        self.history_time = None  # End time of the charts when scrolled back, None for live
+        self.pyramid = pyramid    # Optional history_pyramid.HistoryPyramid over the same columns
+        self.span = None          # Seconds shown when zoomed out, None for the last window samples
+        self.timer = FrameTimer()
+        self.panels = []
+        self.skipped = 0          # Draws skipped because the panel was out of view
+        self._refresh_pending = False
+        self._pass_pending = False
+        self._reported = False
+
+    def add(self, panel):
+        self.panels.append(panel)
+        self.schedule_refresh()
+
+    # Whether any part of widget lies inside the viewport
+    def visible(self, widget):
+        if not widget.winfo_ismapped():
+            return False
+        top = widget.winfo_rooty() - self.viewport.winfo_rooty()
+        return top < self.viewport.winfo_height() and top + widget.winfo_height() > 0
+
+    # Redraw a panel now if it is on screen, otherwise leave it for refresh()
+    def draw(self, panel):
+        if panel.chart is None or not self.visible(panel.chart_widget):
+            panel.stale = True
+            self.skipped += 1
+            return
+        panel.render()
+        panel.stale = False
+        # Draws made by the same tick form one frame, closed once Tk is idle
+        if not self._pass_pending:
+            self._pass_pending = True
+            self.root.after_idle(self._end_pass)
+
+    def _end_pass(self):
+        self._pass_pending = False
+        self.timer.end_pass()
+
+    # Values of the window a panel shows: the live store, or the archive when scrolled back
+    def data(self, key):
+        if self.history_time is None:
+            return self.store.window(key, self.window)
+        return self.history.window(self.window, self.history_time)[f'energy_{key}']
+
+    # x values, y values and x axis length of a panel's line. Zoomed out,
+    # every bucket contributes its min and max so spikes stay visible.
+    def series(self, panel):
+        if self.span is None:
+            data = self.data(panel.key)
+            return np.arange(len(data)), data, self.window
+        end = self.history_time
+        if end is None:
+            end = self.pyramid.levels[0].last_time
+        start = end - self.span
+        pixels = panel.chart_widget.winfo_width()
+        times, low, high, _ = self.pyramid.view(f'energy_{panel.key}', start, end,
+                                                pixels if pixels > 1 else CHART_SIZE[0])
+        return np.repeat(times - start, 2), np.column_stack([low, high]).ravel(), self.span
+
+    # Show the window ending at t (None goes back to live) on every panel
+    def scroll_history(self, t):
+        self.history_time = t
+        self.invalidate_all()
+
+    # Show span seconds per chart (None goes back to the last window samples)
+    def zoom(self, span):
+        self.span = span
+        self.invalidate_all()
+
+    def invalidate_all(self):
+        for panel in self.panels:
+            panel.stale = True
+        self.schedule_refresh()
+
+    # Coalesce scroll and resize events into one refresh when Tk is idle
+    def schedule_refresh(self, *args):
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.root.after_idle(self.refresh)
+
+    # Build charts that came into view (one per idle pass so the window keeps
+    # painting) and redraw visible panels that went stale while hidden
+    def refresh(self):
+        self._refresh_pending = False
+        for panel in self.panels:
+            if not self.visible(panel.chart_widget):
+                continue
+            if panel.chart is None:
+                panel.build()
+                if self.startup is not None:
+                    self.startup.mark(f'chart {panel.key} built')
+                self.draw(panel)
+                self.schedule_refresh()
+                return
+            if panel.stale:
+                self.draw(panel)
+        if self.startup is not None and not self._reported and any(p.chart for p in self.panels):
+            self._reported = True
+            self.startup.report()
+
+
+class PlantPanel:
+    def __init__(self, parent, row, config, group, context):
+        self.parent = parent
+        self.row = row
+        self.config = config
+        self.key = config.key
+        self.group = group  # (start, stop) slice in the engine
+        self.context = context
+        self.chart = None
+        self.stale = True
+
+        # Placeholder holding the chart's grid cell until the renderer builds it
+        self.chart_widget = tk.Frame(parent, width=CHART_SIZE[0], height=CHART_SIZE[1], bg='white')
+        self.chart_widget.grid(row=row, column=0, padx=10, pady=10)
+        self.chart_widget.pack_propagate(False)
+        tk.Label(self.chart_widget, text="Loading chart...", bg='white', fg='grey').pack(expand=True)
+
+        # Plant image, touch button and controls
+        frame = tk.Frame(parent)
+        frame.grid(row=row, column=1, padx=10, pady=10)
+        self.image_path = config.open_image
+        self.image_label = tk.Label(frame, image=context.image(config.open_image))
+        self.image_label.pack()
+        tk.Button(frame, text=f"Touch {config.label}", command=self.touch).pack()
+
+        self.count = None
+        if config.resizable:
+            self.count = tk.IntVar(value=config.plants)
+            count_frame = tk.Frame(frame)
+            count_frame.pack()
+            tk.Entry(count_frame, textvariable=self.count).pack(side=tk.LEFT)
+            tk.Label(count_frame, text="Enter number of plants").pack(side=tk.LEFT)
+            self.count.trace_add("write", lambda *args: context.renderer.draw(self))
+
+        buttons = tk.Frame(frame)
+        buttons.pack(pady=10)
+        tk.Button(buttons, text=f"Start {config.label}", command=self.start).pack(side=tk.LEFT, padx=10)
+        tk.Button(buttons, text=f"Stop {config.label}", command=self.stop).pack(side=tk.LEFT, padx=10)
+        context.renderer.add(self)
+
+    # Plants currently in the group, at most the engine slots it reserves
+    @property
+    def plants(self):
+        if self.count is None:
+            return self.config.plants
+        try:
+            count = self.count.get()
+        except tk.TclError:
+            return 0  # Entry is empty or not a number
+        return min(max(count, 0), max(self.config.plants, self.config.max_plants))
+
+    # Keep the group slice in the worker in sync with the entered count
+    def sync_group(self):
+        start, stop = self.group
+        if self.count is not None and start + self.plants != stop:
+            self.group = (start, start + self.plants)
+            self.context.worker.resize_group(self.key, *self.group)
+
+    def record(self, value):
+        self.context.store.record(self.key, value)
+        self.context.renderer.draw(self)
+
+    # Live sample from the latest worker snapshot
+    def sample(self):
+        self.sync_group()
+        self.record(self.context.worker.latest.energy[self.key])
+
+    def touch(self):
+        context = self.context
+        self.sync_group()
+        context.worker.touch(self.key)
+        # The worker applies the touch on its next step, so show the spike right
+        # away. A spike kernel starts from zero and rises over the next samples.
+        if context.worker.engine.spikes is None:
+            self.record(context.touch_energy * self.plants)
+        self.show_image(self.config.close_image)
+        context.scheduler.after(f'baseline_{self.key}', context.reopen_delay, self.reopen)  # Replaces a pending return
+
+    def reopen(self):
+        self.record(self.context.worker.latest.energy[self.key])  # Plants have reopened in the engine
+        self.show_image(self.config.open_image)
+
+    # Show the plant image at path (the current one again by default, e.g.
+    # after the image size changed)
+    def show_image(self, path=None):
+        self.image_path = path or self.image_path
+        self.image_label.config(image=self.context.image(self.image_path))
+
+    def start(self):
+        # Registering under the same key replaces a running loop, so Start twice never doubles it
+        self.context.scheduler.every(f'series_{self.key}', self.context.update_interval, self.sample)
+
+    def stop(self):
+        self.context.scheduler.cancel(f'series_{self.key}')
+
+    # Swap the placeholder for a matplotlib chart; called by the renderer once visible
+    def build(self):
+        Figure, FigureCanvasTkAgg = load_matplotlib()
+        config = self.config
+        renderer = self.context.renderer
+        figure = Figure()
+        self.axes = figure.add_subplot()
+        canvas = FigureCanvasTkAgg(figure, master=self.parent)
+
+        self.axes.set_title(config.title, color='blue')
+        self.axes.set_xlabel('Time (seconds)', color='green')
+        self.axes.set_ylabel('Energy (µW)', color='green')
+        self.axes.set_ylim(0, config.ylim)
+        self.axes.set_xlim(0, renderer.window)
+        self.axes.grid(True, which='both', linestyle='--', linewidth=0.5)
+        self.line, = self.axes.plot([], [], lw=2, color=config.color, label=config.legend)
+        self.axes.legend(loc='upper right')
+
+        # Spike annotation is created once and only moved / hidden afterwards
+        self.annotation = None
+        if config.annotate:
+            self.annotation = self.axes.annotate('', xy=(0, 0), textcoords='offset points', xytext=(0, 15),
+                                                 ha='center', color='blue', fontsize=8,
+                                                 bbox=dict(boxstyle="round,pad=0.3", edgecolor="blue",
+                                                           facecolor="lightyellow"))
+            self.annotation.set_visible(False)
+
+        self.chart = BlitChart(canvas, self.line, self.annotation, renderer.timer, blit=renderer.blit)
+        self.chart_widget.destroy()
+        self.chart_widget = canvas.get_tk_widget()
+        self.chart_widget.grid(row=self.row, column=0, padx=10, pady=10)
+
+    def render(self):
+        context = self.context
+        x, data, x_max = context.renderer.series(self)
+        self.line.set_data(x, data)
+
+        # Grow the y axis with the group so a full spike always fits
+        y_max = max(self.config.ylim, (context.baseline + context.touch_energy) * self.plants * 1.2)
+        if self.axes.get_ylim() != (0, y_max) or self.axes.get_xlim() != (0, x_max):
+            self.axes.set_ylim(0, y_max)
+            self.axes.set_xlim(0, x_max)
+            self.chart.invalidate()  # Axis ticks changed, re-render the background
+
+        if self.annotation is not None:
+            current = context.store.current[self.key]
+            live = context.renderer.history_time is None and context.renderer.span is None
+            if len(data) and current > context.baseline and live:
+                self.annotation.set_text(f'{current:.2f} µW')
+                self.annotation.xy = (x[-1], current)
+                self.annotation.set_position((0, 15 if current < 0.75 * y_max else -15))
+                self.annotation.set_visible(True)
+            else:
+                self.annotation.set_visible(False)
+
+        self.chart.draw()
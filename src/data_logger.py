@@ -0,0 +1,155 @@
+# Streaming CSV data logger.
+# Rows are handed to a background thread through a queue, so callers on the
+# Tk thread never wait for the disk. The thread writes them in large batches
+# through a buffered file, rotates the active file by size or age, gzips the
+# rotated files and keeps only the most recent ones. An active file left with
+# a different header (the fields changed since it was written) is rotated
+# out before the first row is appended.
+import csv
+import gzip
+import os
+import queue
+import shutil
+import threading
+import time
+
+MAX_BYTES = 5 * 1024 * 1024  # Rotate the active file beyond this size
+MAX_AGE = 24 * 60 * 60       # ... or when it is older than this many seconds
+BACKUP_COUNT = 7             # Compressed files kept after rotation
+BATCH_SIZE = 1000            # Rows written per chunk
+FLUSH_INTERVAL = 5.0         # Seconds before a partial batch is written anyway
+BUFFER_SIZE = 1024 * 1024    # File buffer in bytes
+
+
+class DataLogger(threading.Thread):
+    def __init__(self, directory, fields, name="energy", max_bytes=MAX_BYTES, max_age=MAX_AGE,
+                 backup_count=BACKUP_COUNT, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        super().__init__(name="data-logger", daemon=True)
+        self.directory = directory
+        self.fields = list(fields)
+        self.name_prefix = name
+        self.path = os.path.join(directory, f"{name}.csv")
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows = queue.SimpleQueue()
+        self.rows_written = 0
+        self._stop_event = threading.Event()
+        self._file = None
+        self._writer = None
+        self._opened_at = 0.0
+
+    # Queue one row (a sequence in the order of fields). Never blocks.
+    def log(self, row):
+        self.rows.put(row)
+
+    # Queue many rows at once, e.g. a chunk of a time series
+    def log_many(self, rows):
+        for row in rows:
+            self.rows.put(row)
+
+    # Ask the thread to write what is queued and exit
+    def stop(self, timeout=None):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._open()
+        try:
+            while not self._stop_event.is_set():
+                batch = self._collect(time.monotonic() + self.flush_interval)
+                if batch:
+                    self._write(batch)
+            self._write(self._drain())
+        finally:
+            self._file.close()
+
+    # Gather up to batch_size rows, waiting at most until deadline
+    def _collect(self, deadline):
+        batch = []
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0 or self._stop_event.is_set():
+                break
+            try:
+                batch.append(self.rows.get(timeout=min(timeout, 0.5)))
+            except queue.Empty:
+                continue
+        return batch
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self.rows.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _write(self, batch):
+        if not batch:
+            return
+        self._writer.writerows(batch)
+        self._file.flush()
+        self.rows_written += len(batch)
+        if self._file.tell() >= self.max_bytes or time.time() - self._opened_at >= self.max_age:
+            self._rotate()
+
+    def _open(self):
+        if self._header() not in (None, self.fields):
+            self._compress()
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, "a", newline="", buffering=BUFFER_SIZE)
+        self._writer = csv.writer(self._file)
+        if new_file:
+            self._writer.writerow(self.fields)
+        # Age counts from when the file was started, not from this process
+        self._opened_at = time.time() if new_file else self._started_at()
+
+    # Header row of the active file, None while it is missing or empty
+    def _header(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return None
+        with open(self.path, newline="") as file:
+            return next(csv.reader(file), None)
+
+    # Start time of an existing active file: the time of its first row when
+    # the first field is a Unix time (as the dashboards log), else the file's
+    # creation time where the OS records one, else now
+    def _started_at(self):
+        with open(self.path, newline="") as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            row = next(reader, None)
+        try:
+            return float(row[0])
+        except (TypeError, IndexError, ValueError):
+            return getattr(os.stat(self.path), "st_birthtime", time.time())
+
+    # Close the active file, compress it under a timestamped name and prune old files
+    def _rotate(self):
+        self._file.close()
+        self._compress()
+        self._open()
+
+    def _compress(self):
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        rotated = os.path.join(self.directory, f"{self.name_prefix}-{stamp}.csv.gz")
+        suffix = 1
+        while os.path.exists(rotated):  # Several rotations within one second
+            rotated = os.path.join(self.directory, f"{self.name_prefix}-{stamp}-{suffix}.csv.gz")
+            suffix += 1
+        with open(self.path, "rb") as src, gzip.open(rotated, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(self.path)
+        self._prune()
+
+    def _prune(self):
+        prefix = f"{self.name_prefix}-"
+        archives = sorted((os.path.join(self.directory, f) for f in os.listdir(self.directory)
+                           if f.startswith(prefix) and f.endswith(".csv.gz")), key=os.path.getmtime)
+        for old in archives[:-self.backup_count] if self.backup_count else archives:
+            os.remove(old)
@@ -0,0 +1,111 @@
+# Physics model of magnetically levitated flywheel storage.
+# State is the stored energy E = 1/2 * I * w^2 of each flywheel, held in
+# NumPy arrays so that many flywheels are advanced in one vectorized step.
+# It evolves as
+#     dE/dt = P - (T_b * w + c_d * w^3)
+# where P is the motor/generator power (limited by its rating), T_b the
+# bearing/eddy-current drag torque and c_d the residual windage coefficient.
+# Losses are integrated with an exponential step, which stays stable for any dt,
+# so thousands of hours can be covered with minute-sized steps.
+import math
+import numpy as np
+
+MIN_RPM = 10000   # Generator cut-out: no discharge below this speed
+MAX_RPM = 60000
+RPM_TO_RAD = 2 * math.pi / 60
+STANDBY_LOSS_PER_HOUR = 0.02  # Fraction of full-speed energy lost per hour while idling at MAX_RPM
+BEARING_LOSS_SHARE = 0.4      # Part of the standby loss due to bearings, the rest is windage
+
+
+class FlywheelBank:
+    def __init__(self, count=1, inertia=0.05, max_charge_power=500.0, max_discharge_power=500.0,
+                 min_rpm=MIN_RPM, max_rpm=MAX_RPM, standby_loss_per_hour=STANDBY_LOSS_PER_HOUR,
+                 bearing_loss_share=BEARING_LOSS_SHARE, rpm=0.0):
+        def per_wheel(value):
+            return np.broadcast_to(np.asarray(value, dtype=np.float64), (count,)).copy()
+
+        self.count = count
+        self.inertia = per_wheel(inertia)                        # kg m^2
+        self.max_charge_power = per_wheel(max_charge_power)      # W
+        self.max_discharge_power = per_wheel(max_discharge_power)  # W
+        self.min_omega = per_wheel(min_rpm) * RPM_TO_RAD         # rad/s
+        self.max_omega = per_wheel(max_rpm) * RPM_TO_RAD
+        self.max_energy = self.energy_at(self.max_omega)         # J
+        self.min_energy = self.energy_at(self.min_omega)
+        self.stored = self.energy_at(np.minimum(per_wheel(rpm) * RPM_TO_RAD, self.max_omega))  # J
+        # Derive the loss coefficients from the standby loss at full speed
+        full_loss = per_wheel(standby_loss_per_hour) * self.max_energy / 3600
+        share = per_wheel(bearing_loss_share)
+        self.bearing_torque = full_loss * share / self.max_omega             # N m
+        self.drag_coefficient = full_loss * (1 - share) / self.max_omega ** 3  # W s^3
+        # The same losses written in terms of energy: loss = a * sqrt(E) + b * E^1.5
+        self._loss_a = self.bearing_torque * np.sqrt(2 / self.inertia)
+        self._loss_b = self.drag_coefficient * (2 / self.inertia) ** 1.5
+
+    def energy_at(self, omega):
+        return 0.5 * self.inertia * omega ** 2
+
+    @property
+    def omega(self):
+        return np.sqrt(2 * self.stored / self.inertia)
+
+    @property
+    def rpm(self):
+        return self.omega / RPM_TO_RAD
+
+    @property
+    def energy(self):
+        return self.stored
+
+    # Energy that can still be delivered before the generator cuts out
+    @property
+    def usable_energy(self):
+        return np.maximum(self.stored - self.min_energy, 0)
+
+    # Loss power in W at the given angular speed (current speed by default)
+    def losses(self, omega=None):
+        omega = self.omega if omega is None else omega
+        return self.bearing_torque * omega + self.drag_coefficient * omega ** 3
+
+    # Advance every flywheel by dt seconds. power is the requested motor power
+    # in W per flywheel (positive spins up, negative draws energy out). Returns
+    # the power actually accepted (>0) or delivered (<0) by each flywheel.
+    def step(self, power, dt):
+        energy = self.stored
+        root = np.sqrt(energy)
+        loss = (self._loss_a + self._loss_b * energy) * root
+        power = np.minimum(np.maximum(power, -self.max_discharge_power), self.max_charge_power)
+        # Cannot charge past max speed or discharge below the cut-out speed
+        power = np.minimum(power, (self.max_energy - energy) / dt + loss)
+        power = np.maximum(power, np.minimum(self.min_energy - energy, 0) / dt)
+        # Exponential step with the loss rate (loss / E) taken at the midpoint energy
+        mid = np.maximum(energy + (power - loss) * (dt / 2), 1e-300)
+        root = np.sqrt(mid)
+        rate = self._loss_a / root + self._loss_b * root
+        decay = np.exp(-rate * dt)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gain = np.where(rate > 0, (1 - decay) / rate, dt)  # Lossless wheels integrate linearly
+        energy = energy * decay + power * gain
+        self.stored = np.minimum(np.maximum(energy, 0), self.max_energy)
+        return power
+
+    # Run a whole power schedule: power has shape (steps,) or (steps, count).
+    # Returns (rpm, accepted_power), both shaped (steps, count).
+    def simulate(self, power, dt):
+        power = np.asarray(power, dtype=np.float64)
+        if power.ndim == 1:
+            power = power[:, None]
+        steps = power.shape[0]
+        rpm = np.empty((steps, self.count))
+        accepted = np.empty((steps, self.count))
+        for i in range(steps):
+            accepted[i] = self.step(power[i], dt)
+            rpm[i] = self.stored
+        np.sqrt(2 * rpm / self.inertia, out=rpm)  # Stored energy -> rad/s
+        rpm /= RPM_TO_RAD
+        return rpm, accepted
+
+    # Boost policy: request full charge power from flywheels below the cut-out speed
+    def boost_request(self, target_rpm=None):
+        target = self.min_energy if target_rpm is None else self.energy_at(target_rpm * RPM_TO_RAD)
+        return np.where(self.stored < target, self.max_charge_power, 0.0)
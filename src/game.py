@@ -1,6 +1,7 @@
 import pygame
-import random
 import math
+from game_sim import GameSim, STEP, MAX_FRAME_TIME
+from sprite_cache import TextCache, circle_sprite, button_face
 
 # Initialize Pygame
 pygame.init()
@@ -25,37 +26,72 @@ DARK_GRAY = (50, 50, 50)
 # Fonts
 font = pygame.font.SysFont('Arial', 24)
 large_font = pygame.font.SysFont('Arial', 36)
+text_cache = TextCache(font)
 
 # Plant parameters
 plant_radius = 20
 num_plants = 20
+brush_radius = 40  # Right-drag / touch brush that closes every plant it passes over
 
 # Flywheel parameters
 flywheel_x, flywheel_y = WIDTH - 150, HEIGHT // 2
 flywheel_radius = 70
-flywheel_angle = 0
-flywheel_speed = 0
-max_speed = 20
-
-# Energy level
-energy_level = 0
-max_energy = num_plants * 10
+max_speed = 20  # Degrees per step
 
 # Spark particles
-sparks = []
+spark_lifetime = 30  # Steps
 
 # UI Panels
 control_panel = pygame.Rect(0, 0, 200, HEIGHT)
 simulation_panel = pygame.Rect(200, 0, WIDTH - 200, HEIGHT)
 energy_bar_width = simulation_panel.width - 40
 
-# Plant list
-plants = []
+# Pre-rendered sprites
+open_sprite = circle_sprite(plant_radius, NEON_BLUE)
+closed_sprite = circle_sprite(plant_radius, RED)
+spark_sprite = circle_sprite(5, YELLOW)
+
+# Static background layer: panels plus every plant in its open state.
+# Each frame only regions that changed are redrawn and pushed to the display.
+background = pygame.Surface((WIDTH, HEIGHT))
+background.fill(BLACK)
+pygame.draw.rect(background, DARK_GRAY, control_panel)
+pygame.draw.rect(background, BLACK, simulation_panel)
+flywheel_rect = pygame.Rect(flywheel_x - flywheel_radius - 3, flywheel_y - flywheel_radius - 3,
+                            2 * flywheel_radius + 6, 2 * flywheel_radius + 6)
+energy_rect = pygame.Rect(control_panel.width + 10, 10, energy_bar_width, 60)
+max_dirty_rects = 1000  # Beyond this many rects a full flip is cheaper
+# Window damage (restore, uncovering) needs the whole background pushed again
+expose_events = tuple(getattr(pygame, name) for name in ('VIDEOEXPOSE', 'WINDOWEXPOSED') if hasattr(pygame, name))
+
+# Screen rects for sprites of the given radius centred on panel coordinates
+def sprite_rects(xs, ys, radius):
+    offset = control_panel.width - radius
+    size = 2 * radius
+    return [pygame.Rect(x + offset, y - radius, size, size) for x, y in zip(xs, ys)]
+
+# Blit one sprite at many rects, returns the rects
+def blit_sprites(surface, sprite, rects):
+    surface.blits([(sprite, rect) for rect in rects], doreturn=False)
+    return rects
+
+# Fixed-timestep simulation state: plants in struct-of-arrays form with a
+# spatial index over their positions (simulation panel coordinates), flywheel,
+# energy and sparks
+sim = GameSim(simulation_panel.width, simulation_panel.height, plant_radius, max_speed, spark_lifetime)
+plants = sim.plants
+sparks = sim.sparks
 def add_plants(num):
-    for _ in range(num):
-        x = random.randint(50, simulation_panel.width - 50)
-        y = random.randint(100, simulation_panel.height - 150)
-        plants.append({'x': x, 'y': y, 'state': 'open'})
+    indices = sim.add_plants(num)
+    # Paint the new plants into the background layer, returns their screen rects
+    rects = sprite_rects(plants.x[indices].tolist(), plants.y[indices].tolist(), plant_radius)
+    return blit_sprites(background, open_sprite, rects)
+
+# Close every open plant touched by a brush stroke given in screen coordinates
+def brush_plants(x0, y0, x1, y1):
+    offset = control_panel.width
+    hit = plants.grid.query_segment(x0 - offset, y0, x1 - offset, y1, brush_radius)
+    sim.close([index for index in hit if not plants.closed[index]])
 
 # Button class
 class Button:
@@ -64,13 +100,21 @@ class Button:
         self.text = text
         self.color = color
         self.hover_color = hover_color
+        # One pre-rendered face per hover state
+        label = text_cache.render(text, WHITE)
+        self.faces = {False: button_face(self.rect.size, color, label),
+                      True: button_face(self.rect.size, hover_color, label)}
+        self.hovered = None
 
+    # Redraw only when the hover state changes; returns the dirty rect or None
     def draw(self, screen):
-        color = self.hover_color if self.rect.collidepoint(pygame.mouse.get_pos()) else self.color
-        pygame.draw.rect(screen, color, self.rect, border_radius=12)
-        text_surface = font.render(self.text, True, WHITE)
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        screen.blit(text_surface, text_rect)
+        hovered = self.rect.collidepoint(pygame.mouse.get_pos())
+        if hovered == self.hovered:
+            return None
+        self.hovered = hovered
+        screen.blit(background, self.rect, self.rect)  # Clear behind the rounded corners
+        screen.blit(self.faces[hovered], self.rect)
+        return self.rect
 
     def is_clicked(self, event):
         return event.type == pygame.MOUSEBUTTONDOWN and self.rect.collidepoint(event.pos)
@@ -86,74 +130,104 @@ add_plants(num_plants)
 # Main loop
 running = True
 clock = pygame.time.Clock()
-simulation_active = False
+accumulator = 0.0    # Wall time not yet consumed by fixed steps
+overlay_rects = []   # Regions drawn over the background last frame (closed plants, sparks, flywheel)
+last_energy = None   # Energy bar state last drawn
 
-while running:
-    screen.fill(BLACK)
+screen.blit(background, (0, 0))
+pygame.display.flip()
 
-    # Draw panels
-    pygame.draw.rect(screen, DARK_GRAY, control_panel)
-    pygame.draw.rect(screen, BLACK, simulation_panel)
+while running:
+    # Erase last frame's overlays by restoring the background under them
+    dirty = overlay_rects
+    for rect in overlay_rects:
+        screen.blit(background, rect, rect)
+    overlay_rects = []
+    full_redraw = False
 
     # Draw buttons
-    start_button.draw(screen)
-    stop_button.draw(screen)
-    add_plant_button.draw(screen)
+    for button in (start_button, stop_button, add_plant_button):
+        rect = button.draw(screen)
+        if rect:
+            dirty.append(rect)
 
     # Event handling
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
+        elif event.type in expose_events:
+            # Repaint everything and make the cached buttons and energy bar draw again
+            screen.blit(background, (0, 0))
+            for button in (start_button, stop_button, add_plant_button):
+                button.hovered = None
+                button.draw(screen)
+            last_energy = None
+            full_redraw = True
         elif start_button.is_clicked(event):
-            simulation_active = True
+            sim.active = True
         elif stop_button.is_clicked(event):
-            simulation_active = False
+            sim.active = False
         elif add_plant_button.is_clicked(event):
-            add_plants(1)
-            max_energy = len(plants) * 10  # Update max energy based on the number of plants
+            for rect in add_plants(1):
+                screen.blit(background, rect, rect)
+                dirty.append(rect)
         elif event.type == pygame.MOUSEBUTTONDOWN:
-            if simulation_active:
-                for plant in plants:
-                    dist = ((event.pos[0] - plant['x'] - control_panel.width)**2 + (event.pos[1] - plant['y'])**2)**0.5
-                    if dist < plant_radius:
-                        plant['state'] = 'closed'
-                        flywheel_speed = min(flywheel_speed + 1, max_speed)
-                        energy_level = min(energy_level + 10, max_energy)
-                        # Add spark particles
-                        sparks.append({'x': plant['x'], 'y': plant['y'], 'lifetime': 30})
-
-    # Plant simulation
-    for plant in plants:
-        color = RED if plant['state'] == 'closed' else NEON_BLUE
-        pygame.draw.circle(screen, color, (plant['x'] + control_panel.width, plant['y']), plant_radius)
-        if plant['state'] == 'closed':
-            plant['state'] = 'open'  # Reopen after one frame
-
-    # Flywheel simulation
-    if simulation_active:
-        flywheel_angle += flywheel_speed
-        if flywheel_angle >= 360:
-            flywheel_angle -= 360
-        flywheel_speed = max(0, flywheel_speed - 0.1)  # Gradual slowdown
-        flywheel_glow = (min(255, 100 + energy_level), 100, 255)  # Dynamic glow effect
+            if sim.active:
+                # Only the grid cells around the click are checked
+                sim.close(plants.hit(event.pos[0] - control_panel.width, event.pos[1]))
+        elif event.type == pygame.MOUSEMOTION and event.buttons[2]:
+            if sim.active:
+                x, y = event.pos
+                brush_plants(x - event.rel[0], y - event.rel[1], x, y)
+        elif event.type in (pygame.FINGERDOWN, pygame.FINGERMOTION):
+            # Every finger acts as its own brush; touch coordinates are normalised to 0..1
+            if sim.active:
+                x, y = event.x * WIDTH, event.y * HEIGHT
+                dx, dy = getattr(event, 'dx', 0) * WIDTH, getattr(event, 'dy', 0) * HEIGHT
+                brush_plants(x - dx, y - dy, x, y)
+
+    # Plant simulation: open plants are already on the background, draw only the closed ones
+    closed = plants.recently_closed()
+    if closed:
+        rects = sprite_rects(plants.x[closed].tolist(), plants.y[closed].tolist(), plant_radius)
+        overlay_rects.extend(blit_sprites(screen, closed_sprite, rects))
+    plants.reopen()  # Reopen after one frame
+
+    # Advance the simulation in fixed steps for the wall time that has passed,
+    # then draw the flywheel interpolated between the last two steps
+    accumulator += min(clock.tick(60) / 1000, MAX_FRAME_TIME)
+    while accumulator >= STEP:
+        sim.step()
+        accumulator -= STEP
+    if sim.active:
+        flywheel_angle = sim.interpolated_angle(accumulator / STEP)
+        flywheel_glow = (min(255, 100 + sim.energy_level), 100, 255)  # Dynamic glow effect
         pygame.draw.circle(screen, flywheel_glow, (flywheel_x, flywheel_y), flywheel_radius, 3)
         flywheel_end_x = flywheel_x + flywheel_radius * math.cos(math.radians(flywheel_angle))
         flywheel_end_y = flywheel_y + flywheel_radius * math.sin(math.radians(flywheel_angle))
         pygame.draw.line(screen, flywheel_glow, (flywheel_x, flywheel_y), (flywheel_end_x, flywheel_end_y), 3)
+        overlay_rects.append(flywheel_rect)
 
     # Sparks display
-    for spark in sparks:
-        pygame.draw.circle(screen, YELLOW, (spark['x'] + control_panel.width, spark['y']), 5)
-        spark['lifetime'] -= 1
-    sparks = [spark for spark in sparks if spark['lifetime'] > 0]
-
-    # Energy bar
-    pygame.draw.rect(screen, DARK_GRAY, [control_panel.width + 10, 10, energy_bar_width, 20], border_radius=10)
-    pygame.draw.rect(screen, YELLOW, [control_panel.width + 10, 10, (energy_level / max_energy) * energy_bar_width, 20], border_radius=10)
-    energy_text = font.render(f'Energy: {energy_level}/{max_energy}', True, WHITE)
-    screen.blit(energy_text, (control_panel.width + 10, 40))
-
-    pygame.display.flip()
-    clock.tick(60)
+    spark_xs, spark_ys = sparks.positions()
+    overlay_rects.extend(blit_sprites(screen, spark_sprite, sprite_rects(spark_xs.tolist(), spark_ys.tolist(), 5)))
+
+    # Energy bar, redrawn only when the energy changes
+    energy_level, max_energy = sim.energy_level, sim.max_energy
+    if (energy_level, max_energy) != last_energy:
+        last_energy = (energy_level, max_energy)
+        screen.blit(background, energy_rect, energy_rect)
+        pygame.draw.rect(screen, DARK_GRAY, [control_panel.width + 10, 10, energy_bar_width, 20], border_radius=10)
+        pygame.draw.rect(screen, YELLOW, [control_panel.width + 10, 10, (energy_level / max_energy) * energy_bar_width, 20], border_radius=10)
+        energy_text = text_cache.render(f'Energy: {energy_level}/{max_energy}', WHITE)
+        screen.blit(energy_text, (control_panel.width + 10, 40))
+        dirty.append(energy_rect)
+
+    # Push only the changed regions to the display
+    dirty.extend(overlay_rects)
+    if full_redraw or len(dirty) > max_dirty_rects:
+        pygame.display.flip()
+    elif dirty:
+        pygame.display.update(dirty)
 
 pygame.quit()
@@ -0,0 +1,210 @@
+# Struct-of-arrays state for the pygame simulation.
+# Plants and sparks live in preallocated NumPy arrays that grow by doubling,
+# so adding plants is amortised O(1) and per-frame updates (reopening plants,
+# spark lifetime decay and removal) are single vectorized operations instead
+# of Python loops over dicts. No pygame imports here.
+#
+# GameSim advances in fixed steps of STEP seconds whatever the frame rate;
+# game.py feeds it from an accumulator and interpolates between steps when
+# drawing. Run this file directly to step the same simulation headless:
+#
+#   python game_sim.py --plants 200 --steps 1000000 --touch-rate 5
+import argparse
+import sys
+import time
+import numpy as np
+from plant_grid import SpatialGrid
+
+STEP_RATE = 60         # Simulation steps per second (the original frame rate)
+STEP = 1.0 / STEP_RATE
+MAX_FRAME_TIME = 0.25  # Longest frame fed to the accumulator, so a stall cannot snowball
+
+
+def _grow(array, capacity):
+    grown = np.zeros(capacity, dtype=array.dtype)
+    grown[:array.size] = array
+    return grown
+
+
+class PlantField:
+    def __init__(self, radius, capacity=1024, seed=None):
+        self.radius = radius
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.int32)  # Simulation panel coordinates
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.closed = np.zeros(capacity, dtype=bool)
+        self.grid = SpatialGrid(radius * 2)
+        self.rng = np.random.default_rng(seed)
+        self._closed_indices = []  # Plants closed since the last reopen()
+
+    def __len__(self):
+        return self.count
+
+    # Add plants at the given coordinates, returns their indices
+    def add(self, xs, ys):
+        xs = np.atleast_1d(np.asarray(xs, dtype=np.int32))
+        ys = np.atleast_1d(np.asarray(ys, dtype=np.int32))
+        start, stop = self.count, self.count + xs.size
+        if stop > self.x.size:
+            capacity = max(stop, 2 * self.x.size)
+            self.x, self.y, self.closed = (_grow(a, capacity) for a in (self.x, self.y, self.closed))
+        self.x[start:stop] = xs
+        self.y[start:stop] = ys
+        for index, x, y in zip(range(start, stop), xs.tolist(), ys.tolist()):
+            self.grid.insert(index, x, y)
+        self.count = stop
+        return np.arange(start, stop)
+
+    # Add n plants at random positions with x in [x_min, x_max] and y in [y_min, y_max]
+    def add_random(self, n, x_min, x_max, y_min, y_max):
+        return self.add(self.rng.integers(x_min, x_max + 1, n), self.rng.integers(y_min, y_max + 1, n))
+
+    def close(self, indices):
+        self.closed[indices] = True
+        self._closed_indices.extend(np.atleast_1d(indices).tolist())
+
+    # Indices of plants closed since the last reopen()
+    def recently_closed(self):
+        return self._closed_indices
+
+    # Reopen every plant closed since the last call
+    def reopen(self):
+        if self._closed_indices:
+            self.closed[self._closed_indices] = False
+            self._closed_indices.clear()
+
+    # Indices of plants hit by a click at (x, y)
+    def hit(self, x, y):
+        return self.grid.query(x, y, self.radius)
+
+    # Views of the live part of the arrays
+    def positions(self):
+        return self.x[:self.count], self.y[:self.count]
+
+
+class SparkPool:
+    def __init__(self, capacity=1024):
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.lifetime = np.zeros(capacity, dtype=np.float32)  # Frames left
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, xs, ys, lifetime):
+        xs, ys = np.atleast_1d(xs), np.atleast_1d(ys)
+        start, stop = self.count, self.count + xs.size
+        if stop > self.x.size:
+            capacity = max(stop, 2 * self.x.size)
+            self.x, self.y, self.lifetime = (_grow(a, capacity) for a in (self.x, self.y, self.lifetime))
+        self.x[start:stop] = xs
+        self.y[start:stop] = ys
+        self.lifetime[start:stop] = lifetime
+        self.count = stop
+
+    # Age every spark by amount and compact the survivors to the front of the arrays
+    def decay(self, amount=1):
+        n = self.count
+        if n == 0:
+            return
+        life = self.lifetime[:n]
+        life -= amount
+        alive = life > 0
+        survivors = int(np.count_nonzero(alive))
+        if survivors < n:
+            for array in (self.x, self.y, self.lifetime):
+                array[:survivors] = array[:n][alive]
+            self.count = survivors
+
+    def positions(self):
+        return self.x[:self.count], self.y[:self.count]
+
+
+# Plants, flywheel, energy and sparks advanced in fixed steps. Speeds are in
+# degrees per step and lifetimes in steps, so one step matches one frame of
+# the original 60 fps loop.
+class GameSim:
+    def __init__(self, width, height, plant_radius=20, max_speed=20, spark_lifetime=30,
+                 energy_per_plant=10, seed=None):
+        self.width = width  # Simulation panel size
+        self.height = height
+        self.plants = PlantField(plant_radius, seed=seed)
+        self.sparks = SparkPool()
+        self.max_speed = max_speed
+        self.spark_lifetime = spark_lifetime
+        self.energy_per_plant = energy_per_plant
+        self.energy_level = 0
+        self.angle = 0.0
+        self.previous_angle = 0.0  # Angle before the last step, for interpolation
+        self.speed = 0.0
+        self.active = False
+        self.steps = 0
+
+    @property
+    def max_energy(self):
+        return len(self.plants) * self.energy_per_plant
+
+    # Add plants at random positions away from the panel edges, returns their indices
+    def add_plants(self, n):
+        return self.plants.add_random(n, 50, self.width - 50, 100, self.height - 150)
+
+    # Close plants and feed their energy into the flywheel
+    def close(self, indices):
+        if not len(indices):
+            return
+        self.plants.close(indices)
+        self.speed = min(self.speed + len(indices), self.max_speed)
+        self.energy_level = min(self.energy_level + self.energy_per_plant * len(indices), self.max_energy)
+        self.sparks.spawn(self.plants.x[indices], self.plants.y[indices], self.spark_lifetime)
+
+    def step(self):
+        self.previous_angle = self.angle
+        if self.active:
+            self.angle = (self.angle + self.speed) % 360
+            self.speed = max(0.0, self.speed - 0.1)  # Gradual slowdown
+        self.sparks.decay()
+        self.steps += 1
+
+    # Flywheel angle alpha of the way from the previous step to the current one
+    def interpolated_angle(self, alpha):
+        return (self.previous_angle + ((self.angle - self.previous_angle) % 360) * alpha) % 360
+
+
+# Step sim as fast as possible with random touches arriving as a Poisson process
+def run_headless(sim, steps, touches_per_second=0.0, seed=None):
+    rng = np.random.default_rng(seed)
+    touches = rng.poisson(touches_per_second * STEP, steps)
+    sim.active = True
+    started = time.perf_counter()
+    for n in touches.tolist():
+        if n:
+            sim.close(np.unique(rng.integers(0, len(sim.plants), n)))
+        sim.step()
+        sim.plants.reopen()
+    return time.perf_counter() - started
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Step the pygame simulation headless.")
+    parser.add_argument("--plants", type=int, default=20, help="number of plants (default: 20)")
+    parser.add_argument("--steps", type=int, default=100000, help="fixed steps to run (default: 100000)")
+    parser.add_argument("--touch-rate", type=float, default=2.0, help="touches per second (default: 2)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible runs")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sim = GameSim(1000, 800, seed=args.seed)  # Same panel as game.py
+    sim.add_plants(args.plants)
+    elapsed = run_headless(sim, args.steps, args.touch_rate, args.seed)
+    print(f"{args.steps} steps ({args.steps * STEP:.1f} s simulated) in {elapsed:.3f} s, "
+          f"{args.steps / elapsed:.0f} steps/s")
+    print(f"energy {sim.energy_level}/{sim.max_energy}, flywheel {sim.angle:.1f} deg at {sim.speed:.1f} deg/step, "
+          f"{len(sim.sparks)} sparks")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+# Greenhouse topology and per-section energy aggregation.
+# Plants sit in 2x2 ft sections of 4, sections tile 10x10 ft grids (5x5
+# sections, 100 plants) and grids tile the greenhouse. The greenhouse owns a
+# contiguous slice of the plant engine, laid out section by section, so a
+# section or a whole grid is always one [start, stop) range.
+#
+# SectionTotals keeps per-section open-plant counts and spike energy cached
+# and only applies the plants the engine reports as changed (its watch()
+# log of touches and reopens) since the last sample. Grid and greenhouse
+# totals are then group-by reductions (np.bincount) over the section sums,
+# so drilling down from the greenhouse to one section never goes back to the
+# per-plant arrays. With a spike kernel the engine keeps no per-plant
+# amplitude to cache; sections are read straight from the live touch events
+# with one prefix-sum pass, so the caches and the watch log are not used.
+from typing import NamedTuple
+import numpy as np
+
+SECTION_FEET = 2         # Side of one section in feet
+PLANTS_PER_SECTION = 4
+GRID_FEET = 10           # Side of one modular grid in feet
+
+
+class Greenhouse:
+    def __init__(self, grid_rows=1, grid_cols=1, start=0, plants_per_section=PLANTS_PER_SECTION,
+                 section_feet=SECTION_FEET, grid_feet=GRID_FEET):
+        self.grid_rows = grid_rows
+        self.grid_cols = grid_cols
+        self.section_feet = section_feet
+        self.side = grid_feet // section_feet  # Sections along one side of a grid
+        self.plants_per_section = plants_per_section
+        self.sections_per_grid = self.side * self.side
+        self.grid_count = grid_rows * grid_cols
+        self.section_count = self.grid_count * self.sections_per_grid
+        self.count = self.section_count * plants_per_section
+        self.start = start  # First plant of the greenhouse in the engine
+        self.stop = start + self.count
+        # Group-by keys: plant (offset from start) -> section, section -> grid
+        self.section_of = np.repeat(np.arange(self.section_count), plants_per_section)
+        self.grid_of = np.repeat(np.arange(self.grid_count), self.sections_per_grid)
+
+    # Engine slice of one section / one grid
+    def section_range(self, section):
+        start = self.start + section * self.plants_per_section
+        return start, start + self.plants_per_section
+
+    def grid_range(self, grid):
+        plants = self.sections_per_grid * self.plants_per_section
+        start = self.start + grid * plants
+        return start, start + plants
+
+    def sections_of_grid(self, grid):
+        return range(grid * self.sections_per_grid, (grid + 1) * self.sections_per_grid)
+
+    # (row, col) of a grid in the greenhouse and of a section within its grid
+    def grid_position(self, grid):
+        return divmod(grid, self.grid_cols)
+
+    def section_position(self, section):
+        return divmod(section % self.sections_per_grid, self.side)
+
+    # Corner of a section in feet from the greenhouse corner
+    def section_origin(self, section):
+        grid_row, grid_col = self.grid_position(section // self.sections_per_grid)
+        row, col = self.section_position(section)
+        return ((grid_col * self.side + col) * self.section_feet,
+                (grid_row * self.side + row) * self.section_feet)
+
+
+class GreenhouseReading(NamedTuple):
+    sections: np.ndarray  # µW per section
+    grids: np.ndarray     # µW per grid
+    total: float          # µW for the whole greenhouse
+
+
+class SectionTotals:
+    def __init__(self, greenhouse, engine):
+        self.greenhouse = greenhouse
+        self.engine = engine
+        self.open = np.zeros(greenhouse.section_count, dtype=np.int64)    # Open plants per section
+        self.spike = np.zeros(greenhouse.section_count, dtype=np.float64)  # Closed-plant energy per section
+        self._closed = np.zeros(greenhouse.count, dtype=bool)              # Engine state already applied
+        self._amplitude = np.zeros(greenhouse.count, dtype=np.float32)
+        self.closed_total = 0
+        self._changes = None
+        if engine.spikes is None:  # The kernel path reads the touch events instead
+            self._changes = engine.watch()
+            self.rebuild()
+
+    # Recompute every cached sum from the engine
+    def rebuild(self):
+        greenhouse = self.greenhouse
+        self._changes.clear()
+        self._closed[:] = False
+        self._amplitude[:] = 0
+        stop = max(min(greenhouse.stop, self.engine.count), greenhouse.start)  # The engine may not cover the greenhouse yet
+        self._closed[:stop - greenhouse.start] = self.engine.closed[greenhouse.start:stop]
+        self._amplitude[:stop - greenhouse.start] = self.engine.amplitude[greenhouse.start:stop]
+        closed, amplitude = self._closed, self._amplitude
+        n_sections = greenhouse.section_count
+        self.open = greenhouse.plants_per_section - np.bincount(greenhouse.section_of, weights=closed,
+                                                                minlength=n_sections).astype(np.int64)
+        self.spike = np.bincount(greenhouse.section_of, weights=amplitude, minlength=n_sections)
+        self.closed_total = int(np.count_nonzero(closed))
+
+    # Apply only the plants the engine logged as closed, reopened or resized
+    # since the last call. Returns the number of plants applied.
+    def sync(self):
+        greenhouse = self.greenhouse
+        applied = 0
+        while self._changes:
+            start, stop, indices = self._changes.popleft()
+            if indices is None:
+                plants = np.arange(max(start, greenhouse.start), min(stop, greenhouse.stop))
+            else:
+                plants = indices[(indices >= greenhouse.start) & (indices < greenhouse.stop)]
+            applied += self._apply(plants)
+        return applied
+
+    # Fold the current engine state of the given plants into the section sums
+    def _apply(self, plants):
+        greenhouse, engine = self.greenhouse, self.engine
+        present = plants < engine.count  # Plants past a shrunk engine read as open
+        closed = np.zeros(plants.size, dtype=bool)
+        amplitude = np.zeros(plants.size, dtype=np.float32)
+        closed[present] = engine.closed[plants[present]]
+        amplitude[present] = engine.amplitude[plants[present]]
+        offsets = plants - greenhouse.start
+        changed = (closed != self._closed[offsets]) | (amplitude != self._amplitude[offsets])
+        offsets, closed, amplitude = offsets[changed], closed[changed], amplitude[changed]
+        if offsets.size == 0:
+            return 0
+        sections = greenhouse.section_of[offsets]
+        opened = self._closed[offsets].astype(np.int64) - closed  # +1 reopened, -1 closed
+        np.add.at(self.open, sections, opened)
+        np.add.at(self.spike, sections, amplitude.astype(np.float64) - self._amplitude[offsets])
+        self.closed_total -= int(opened.sum())
+        self._closed[offsets] = closed
+        self._amplitude[offsets] = amplitude
+        return offsets.size
+
+    # Current energy of every section, grid and the greenhouse, read like
+    # PlantArray.energy. With a spike kernel every plant reads the baseline
+    # plus its spikes, summed per section from the live touch events.
+    # Otherwise open plants read uniformly in [baseline, spike]; as in
+    # PlantArray._resting_energy each section's sum is drawn from its normal
+    # approximation, one draw per section rather than one per plant.
+    def sample(self, rng=None):
+        engine = self.engine
+        greenhouse = self.greenhouse
+        if engine.spikes is not None:
+            edges = greenhouse.start + np.arange(greenhouse.section_count + 1) * greenhouse.plants_per_section
+            sections = (greenhouse.plants_per_section * engine.baseline
+                        + engine.spikes.energy_bins(engine.time, edges))
+            if engine.noise:
+                rng = engine.rng if rng is None else rng
+                noise = engine.noise * greenhouse.plants_per_section ** 0.5
+                sections = np.maximum(sections + rng.normal(0, noise, sections.size), 0)
+        else:
+            self.sync()
+            rng = engine.rng if rng is None else rng
+            width = engine.spike - engine.baseline
+            resting = rng.normal(self.open * (engine.baseline + width / 2), width * np.sqrt(self.open / 12))
+            resting = np.clip(resting, self.open * engine.baseline, self.open * engine.spike)
+            sections = resting + self.spike
+        grids = np.bincount(greenhouse.grid_of, weights=sections, minlength=greenhouse.grid_count)
+        return GreenhouseReading(sections, grids, float(grids.sum()))
@@ -0,0 +1,196 @@
+# Append-only, memory-mapped columnar archive of dashboard samples.
+# Every column (time, the energy of each group, battery, flywheel, ...) is a
+# raw float64 file in one directory, mapped with np.memmap and grown a chunk
+# at a time. A small header file holds the number of committed rows; the
+# writer fills the columns first and bumps the count last, so readers (in
+# this or any other process) map the same files and see new rows as soon as
+# they re-read the count, without copying anything.
+#
+# The time column only ever increases, so it doubles as the time index:
+# locating a time is a binary search (np.searchsorted) that touches a few
+# pages, and reading a window maps only the pages of that window. Opening
+# weeks of history therefore costs the same as opening an empty archive.
+#
+#   archive = HistoryArchive("logs/history", ["energy", "battery"])  # writer
+#   archive.append(time.time(), (1.2, 0.5))
+#   reader = HistoryArchive("logs/history", mode="r")                # any process
+#   rows = reader.between(t0, t1)   # {"time": view, "energy": view, ...}
+#
+# A writer opened with rollover=True moves an archive with other columns
+# (e.g. from before a panel was added) aside to a timestamped directory and
+# starts a new one instead of refusing to open.
+import json
+import mmap
+import os
+import time
+import numpy as np
+
+CHUNK_ROWS = 1 << 16  # Rows added to every column file when it fills up
+DTYPE = np.dtype("<f8")
+META_FILE = "columns.json"
+HEADER_FILE = "rows.bin"  # int64 committed row count
+
+
+# Columns (without time) of the archive in directory, None if there is none
+def stored_columns(directory):
+    meta_path = os.path.join(directory, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as file:
+        return json.load(file)["columns"][1:]
+
+
+# Move directory aside as directory-YYYYmmdd-HHMMSS; returns the new path
+def retire(directory):
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    retired = f"{directory}-{stamp}"
+    suffix = 1
+    while os.path.exists(retired):  # Several roll-overs within one second
+        retired = f"{directory}-{stamp}-{suffix}"
+        suffix += 1
+    os.rename(directory, retired)
+    return retired
+
+
+class HistoryArchive:
+    def __init__(self, directory, columns=None, mode="a", chunk_rows=CHUNK_ROWS, rollover=False):
+        if mode not in ("a", "r"):
+            raise ValueError("mode must be 'a' (append) or 'r' (read)")
+        self.directory = directory
+        self.mode = mode
+        self.chunk_rows = chunk_rows
+        meta_path = os.path.join(directory, META_FILE)
+        stored = stored_columns(directory)
+        if stored is not None and columns is not None and stored != list(columns):
+            if not rollover or mode == "r":
+                raise ValueError(f"archive in {directory} has columns {stored}, not {list(columns)}")
+            retire(directory)
+            stored = None
+        if stored is not None:
+            self.columns = ["time", *stored]
+        elif mode == "r":
+            raise FileNotFoundError(f"no history archive in {directory}")
+        else:
+            if columns is None:
+                raise ValueError("columns are needed to create an archive")
+            os.makedirs(directory, exist_ok=True)
+            self.columns = ["time", *columns]
+            with open(os.path.join(directory, HEADER_FILE), "wb") as file:
+                file.write(np.int64(0).tobytes())
+            with open(meta_path, "w") as file:
+                json.dump({"columns": self.columns, "dtype": DTYPE.str}, file)
+        access = mmap.ACCESS_READ if mode == "r" else mmap.ACCESS_WRITE
+        self._header_file = open(os.path.join(directory, HEADER_FILE), "rb" if mode == "r" else "r+b")
+        self._header_map = mmap.mmap(self._header_file.fileno(), 8, access=access)
+        self._header = np.frombuffer(self._header_map, dtype=np.int64)
+        self._maps = {}
+        self.capacity = 0
+        self._map()
+
+    def _path(self, column):
+        return os.path.join(self.directory, f"{column}.f8")
+
+    # (Re)map every column file at its current size
+    def _map(self):
+        capacity = None
+        for column in self.columns:
+            path = self._path(column)
+            if self.mode == "a" and not os.path.exists(path):
+                open(path, "wb").close()
+            size = os.path.getsize(path) // DTYPE.itemsize
+            capacity = size if capacity is None else min(capacity, size)
+        self.capacity = capacity
+        if capacity == 0:
+            self._maps = {column: np.empty(0, dtype=DTYPE) for column in self.columns}
+            return
+        mode = "r" if self.mode == "r" else "r+"
+        self._maps = {column: np.memmap(self._path(column), dtype=DTYPE, mode=mode, shape=(capacity,))
+                      for column in self.columns}
+
+    def _grow(self, rows):
+        capacity = self.capacity
+        while capacity < rows:
+            capacity += self.chunk_rows
+        for column in self.columns:
+            with open(self._path(column), "r+b") as file:
+                file.truncate(capacity * DTYPE.itemsize)
+        self._map()
+
+    # Committed rows; readers see rows appended by other processes here
+    def __len__(self):
+        return int(self._header[0])
+
+    # Remap if the writer has grown the files past what is mapped
+    def refresh(self):
+        if len(self) > self.capacity:
+            self._map()
+        return len(self)
+
+    @property
+    def last_time(self):
+        n = len(self)
+        return float(self._maps["time"][n - 1]) if n else -np.inf
+
+    # Append one row; values are in column order (without time) or a dict
+    def append(self, t, values):
+        self.extend([t], [[values[c] for c in self.columns[1:]]] if isinstance(values, dict) else [values])
+
+    # Append many rows: times (n,) and values (n, columns) or a dict of (n,) arrays
+    def extend(self, times, values):
+        if self.mode == "r":
+            raise OSError("archive is open read-only")
+        times = np.asarray(times, dtype=DTYPE)
+        if isinstance(values, dict):
+            values = np.column_stack([values[c] for c in self.columns[1:]])
+        values = np.asarray(values, dtype=DTYPE).reshape(times.size, len(self.columns) - 1)
+        n = len(self)
+        end = n + times.size
+        if end > self.capacity:
+            self._grow(end)
+        # The index needs times in order: a clock stepping back repeats the last time
+        self._maps["time"][n:end] = np.maximum.accumulate(np.maximum(times, self.last_time))
+        for i, column in enumerate(self.columns[1:]):
+            self._maps[column][n:end] = values[:, i]
+        self._header[0] = end  # Publish the rows only once they are written
+
+    # Row index of the first sample at or after t
+    def index(self, t):
+        return int(np.searchsorted(self._maps["time"][:len(self)], t))
+
+    # Read-only views of rows [start, stop)
+    def rows(self, start=0, stop=None):
+        n = self.refresh()
+        start, stop, _ = slice(start, stop).indices(n)
+        views = {}
+        for column in self.columns:
+            view = self._maps[column][start:stop].view(np.ndarray)
+            view.flags.writeable = False
+            views[column] = view
+        return views
+
+    # Rows with t0 <= time < t1
+    def between(self, t0, t1):
+        self.refresh()
+        return self.rows(self.index(t0), self.index(t1))
+
+    # The n rows ending at time t (the newest rows if t is None)
+    def window(self, n, t=None):
+        end = self.refresh()
+        if t is not None:
+            end = self.index(t)
+        return self.rows(max(end - n, 0), end)
+
+    # Write dirty pages to disk (the data is visible to readers without this)
+    def flush(self):
+        if self.mode == "a":
+            for array in self._maps.values():
+                if isinstance(array, np.memmap):
+                    array.flush()
+            self._header_map.flush()
+
+    def close(self):
+        self.flush()
+        self._maps = {}
+        self._header = None  # Release the buffer before closing its map
+        self._header_map.close()
+        self._header_file.close()
@@ -0,0 +1,148 @@
+# Multi-resolution min / max / mean pyramid over the history archive.
+# Each level aggregates the samples into fixed buckets (1 s, 1 min, 1 h by
+# default) and keeps, per column, the minimum, maximum and mean of every
+# bucket plus the bucket's sample count. Levels are HistoryArchives of their
+# own, so they are memory-mapped, time-indexed and readable from other
+# processes like the samples themselves.
+#
+# Levels are maintained incrementally: every level holds its open bucket in
+# memory and writes it out once a sample lands in a later bucket. After a
+# restart backfill() rebuilds each level's open bucket from the samples
+# archive, starting where that level's written buckets end. Batches of
+# samples are folded in with np.minimum/maximum/add.reduceat, so backfilling
+# weeks of archived samples is a handful of array operations.
+#
+# A chart asks for a time range and its width in pixels; view() picks the
+# coarsest level that still has a bucket for every pixel and merges its
+# buckets down to one per pixel. The rows read are bounded by the pixel
+# width times the ratio between levels, and the points drawn by the pixel
+# width, so drawing a month costs about as much as drawing 60 points.
+# Plotting the min / max of each bucket keeps every spike visible.
+import os
+import numpy as np
+from history_archive import HistoryArchive, stored_columns, retire
+
+RESOLUTIONS = (1, 60, 3600)  # Seconds per bucket of each level
+BACKFILL_ROWS = 1 << 20      # Archive rows folded in per batch when backfilling
+
+
+# Archive columns of a level over the given sample columns
+def level_columns(columns):
+    return [*(f"{column}_{stat}" for column in columns for stat in ("min", "max", "mean")), "count"]
+
+
+class PyramidLevel:
+    def __init__(self, directory, columns, resolution):
+        self.columns = list(columns)
+        self.resolution = resolution
+        self.archive = HistoryArchive(directory, level_columns(self.columns))
+        self.bucket = None  # Id of the open bucket (start time / resolution)
+        n = len(self.columns)
+        self.low, self.high, self.sum = np.empty(n), np.empty(n), np.empty(n)
+        self.count = 0
+
+    # Fold samples with non-decreasing times into the level
+    def extend(self, times, values):
+        ids = np.floor(times / self.resolution).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        low = np.minimum.reduceat(values, starts, axis=0)
+        high = np.maximum.reduceat(values, starts, axis=0)
+        total = np.add.reduceat(values, starts, axis=0)
+        count = np.diff(np.r_[starts, ids.size])
+        bucket_ids = ids[starts]
+        if self.bucket is not None and bucket_ids[0] == self.bucket:
+            # First group continues the open bucket
+            low[0] = np.minimum(low[0], self.low)
+            high[0] = np.maximum(high[0], self.high)
+            total[0] += self.sum
+            count[0] += self.count
+        elif self.bucket is not None:
+            self._write(np.array([self.bucket]), self.low[None], self.high[None], self.sum[None],
+                        np.array([self.count]))
+        # Every group but the last is complete; the last stays open
+        if bucket_ids.size > 1:
+            self._write(bucket_ids[:-1], low[:-1], high[:-1], total[:-1], count[:-1])
+        self.bucket = int(bucket_ids[-1])
+        self.low, self.high, self.sum, self.count = low[-1], high[-1], total[-1], int(count[-1])
+
+    def _write(self, ids, low, high, total, count):
+        mean = total / count[:, None]
+        stats = np.stack([low, high, mean], axis=2).reshape(ids.size, -1)  # column-major: c_min, c_max, c_mean
+        self.archive.extend(ids * float(self.resolution), np.column_stack([stats, count]))
+
+    # Bucket start times and (min, max, mean) of one column for buckets
+    # starting in [t0, t1), with the open bucket last if it is in range
+    def buckets(self, column, t0, t1):
+        rows = self.archive.between(t0, t1)
+        times = rows["time"]
+        low, high, mean = rows[f"{column}_min"], rows[f"{column}_max"], rows[f"{column}_mean"]
+        if self.bucket is not None and t0 <= self.bucket * self.resolution < t1:
+            i = self.columns.index(column)
+            times = np.append(times, self.bucket * self.resolution)
+            low, high = np.append(low, self.low[i]), np.append(high, self.high[i])
+            mean = np.append(mean, self.sum[i] / self.count)
+        return times, low, high, mean
+
+    # Time just past the last sample folded in
+    @property
+    def last_time(self):
+        if self.bucket is not None:
+            return (self.bucket + 1) * self.resolution
+        return self.archive.last_time + self.resolution
+
+
+class HistoryPyramid:
+    def __init__(self, directory, columns, resolutions=RESOLUTIONS, rollover=False):
+        self.columns = list(columns)
+        paths = {resolution: os.path.join(directory, f"{resolution}s") for resolution in sorted(resolutions)}
+        # As HistoryArchive(rollover=True): levels built over other columns are moved aside together
+        if rollover and any(stored_columns(path) not in (None, level_columns(self.columns))
+                            for path in paths.values()):
+            retire(directory)
+        self.levels = [PyramidLevel(path, columns, resolution) for resolution, path in paths.items()]
+
+    def append(self, t, values):
+        self.extend([t], [values])
+
+    # Fold samples into every level: times (n,), values (n, columns)
+    def extend(self, times, values):
+        times = np.asarray(times, dtype=np.float64)
+        if times.size == 0:
+            return
+        values = np.asarray(values, dtype=np.float64).reshape(times.size, len(self.columns))
+        for level in self.levels:
+            times = np.maximum.accumulate(np.maximum(times, level.last_time - level.resolution))
+            level.extend(times, values)
+
+    # Fold into every level the archive samples past its last written bucket:
+    # the samples of the bucket that was open when the pyramid was last
+    # closed, and any recorded while the pyramid was not kept
+    def backfill(self, archive):
+        n = archive.refresh()
+        for level in self.levels:
+            for first in range(archive.index(level.last_time), n, BACKFILL_ROWS):
+                rows = archive.rows(first, min(first + BACKFILL_ROWS, n))
+                level.extend(rows["time"], np.column_stack([rows[column] for column in self.columns]))
+
+    # Coarsest level with at least one bucket per pixel over span seconds
+    def level_for(self, span, pixels):
+        for level in reversed(self.levels):
+            if span / level.resolution >= pixels:
+                return level
+        return self.levels[0]
+
+    # (times, min, max, mean) of one column over [t0, t1) with at most
+    # pixels buckets, from the level that matches the pixel width
+    def view(self, column, t0, t1, pixels):
+        pixels = max(int(pixels), 1)
+        times, low, high, mean = self.level_for(t1 - t0, pixels).buckets(column, t0, t1)
+        if times.size <= pixels:
+            return times, low, high, mean
+        # Merge neighbouring buckets down to one per pixel
+        starts = np.flatnonzero(np.r_[True, np.diff(np.arange(times.size) * pixels // times.size) > 0])
+        return (times[starts], np.minimum.reduceat(low, starts), np.maximum.reduceat(high, starts),
+                np.add.reduceat(mean, starts) / np.diff(np.r_[starts, times.size]))
+
+    def close(self):
+        for level in self.levels:
+            level.archive.close()
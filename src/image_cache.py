@@ -0,0 +1,70 @@
+# On-disk cache of resized plant images.
+# Each source image is resized once per target size with PIL and saved as a
+# PNG under images/.cache, named after the source's content hash and the size,
+# so an edited image gets a fresh variant automatically. Later runs load the
+# cached PNG straight into tk.PhotoImage without importing PIL at all, and
+# images are only loaded the first time they are asked for.
+import glob
+import hashlib
+import os
+import tkinter as tk
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images", ".cache")
+DEFAULT_SIZE = (200, 200)
+
+
+class ImageCache:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._images = {}   # (path, size) -> tk.PhotoImage, keeps Tk's references alive
+        self._digests = {}  # path -> (mtime_ns, file size, content hash)
+
+    # Content hash of the source, recomputed only when its mtime or size changes
+    def _digest(self, path):
+        stat = os.stat(path)
+        cached = self._digests.get(path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()[:16]
+        self._digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    # Cache file for path resized to size, created on a miss
+    def variant(self, path, size=DEFAULT_SIZE):
+        width, height = size
+        stem = os.path.splitext(os.path.basename(path))[0]
+        target = os.path.join(self.cache_dir, f"{stem}-{self._digest(path)}-{width}x{height}.png")
+        if not os.path.exists(target):
+            self._build(path, (width, height), target)
+        return target
+
+    def _build(self, path, size, target):
+        from PIL import Image  # Only needed on a cache miss
+        os.makedirs(self.cache_dir, exist_ok=True)
+        partial = f"{target}.{os.getpid()}.tmp"
+        with Image.open(path) as image:
+            image.resize(size).save(partial, format="PNG")
+        os.replace(partial, target)  # Readers never see a half-written file
+        # Drop variants of the same size made from an older version of the source
+        stem = os.path.basename(target).rsplit("-", 2)[0]
+        for stale in glob.glob(os.path.join(self.cache_dir, f"{stem}-*-{size[0]}x{size[1]}.png")):
+            if stale != target:
+                os.remove(stale)
+
+    # tk.PhotoImage of path at size, or None if the source is missing
+    def get(self, path, size=DEFAULT_SIZE):
+        key = (path, tuple(size))
+        image = self._images.get(key)
+        if image is None:
+            try:
+                image = tk.PhotoImage(file=self.variant(path, size))
+            except FileNotFoundError:
+                print(f"Error: Image file not found at {path}")
+                return None
+            self._images[key] = image
+        return image
+
+    # Forget loaded images (e.g. after the window is resized), disk variants stay
+    def clear(self):
+        self._images.clear()
@@ -1,8 +1,8 @@
 # 01: Import necessary libraries
-from PIL import Image, ImageTk
 import tkinter as tk
 from tkinter import ttk
 import os
+from image_cache import ImageCache
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import random
@@ -51,19 +51,10 @@ close_image_path_100 = os.path.join(current_dir, "images/close_100.png")
 open_image_path_custom = os.path.join(current_dir, "images/open_custom.png")
 close_image_path_custom = os.path.join(current_dir, "images/close_custom.png")
 
-# Load, resize, and convert images for display
-def load_image(open_path, close_path):
-    try:
-        img_open = ImageTk.PhotoImage(Image.open(open_path).resize((200, 200)))
-        img_closed = ImageTk.PhotoImage(Image.open(close_path).resize((200, 200)))
-        return img_open, img_closed
-    except FileNotFoundError:
-        print(f"Error: Image files not found at {open_path} or {close_path}")
-        return None, None  # Use default placeholder images if needed
-
-plant_img_open_1, plant_img_closed_1 = load_image(open_image_path_1, close_image_path_1)
-plant_img_open_100, plant_img_closed_100 = load_image(open_image_path_100, close_image_path_100)
-plant_img_open_custom, plant_img_closed_custom = load_image(open_image_path_custom, close_image_path_custom)
+# Resized images come from the on-disk cache and are loaded on first display
+image_cache = ImageCache()
+def plant_image(path):
+    return image_cache.get(path)
 
 # 04: Welcome label at the top
 welcome_label = tk.Label(content_frame, text="Welcome to the MIMOSA Energy Dashboard", font=("Arial", 16))
@@ -136,13 +127,13 @@ def live_update_1():
         root.after(UPDATE_INTERVAL, live_update_1)
     else:
         current_energy_1 = BASELINE_ENERGY
-        plant_label_1.config(image=plant_img_closed_1)
+        plant_label_1.config(image=plant_image(close_image_path_1))
 
 # 10: Function to handle plant touch for 1 plant
 def touch_plant_1():
     global current_energy_1
     current_energy_1 = ENERGY_PER_PLANT / 600  # Convert mV to µW for 10 minutes
-    plant_label_1.config(image=plant_img_closed_1)
+    plant_label_1.config(image=plant_image(close_image_path_1))
     
     # Update the chart immediately to show the spike
     update_chart_1()
@@ -154,14 +145,14 @@ def return_to_baseline_1():
     global current_energy_1
     current_energy_1 = BASELINE_ENERGY  # Return to baseline energy
     update_chart_1()  # Update the chart to reflect the change
-    plant_label_1.config(image=plant_img_open_1)  # Revert image back
+    plant_label_1.config(image=plant_image(open_image_path_1))  # Revert image back
 
 # Create a frame for the 1 plant section
 plant_frame_1 = tk.Frame(content_frame)
 plant_frame_1.grid(row=1, column=1, padx=10, pady=10)
 
 # Display initial plant image in a label for 1 plant
-plant_label_1 = tk.Label(plant_frame_1, image=plant_img_open_1)
+plant_label_1 = tk.Label(plant_frame_1, image=plant_image(open_image_path_1))
 plant_label_1.pack()
 
 # Button to touch the plant for 1 plant
@@ -214,7 +205,7 @@ def live_update_100():
 def touch_plant_100():
     global current_energy_100
     current_energy_100 = ENERGY_PER_PLANT / 600  # Convert mV to µW for 10 minutes
-    plant_label_100.config(image=plant_img_closed_100)
+    plant_label_100.config(image=plant_image(close_image_path_100))
     
     # Update the chart immediately to show the spike
     update_chart_100()
@@ -226,14 +217,14 @@ def return_to_baseline_100():
     global current_energy_100
     current_energy_100 = BASELINE_ENERGY  # Return to baseline energy
     update_chart_100()  # Update the chart to reflect the change
-    plant_label_100.config(image=plant_img_open_100)  # Revert image back
+    plant_label_100.config(image=plant_image(open_image_path_100))  # Revert image back
 
 # Create a frame for the 100 plants section
 plant_frame_100 = tk.Frame(content_frame)
 plant_frame_100.grid(row=2, column=1, padx=10, pady=10)
 
 # Display initial plant image in a label for 100 plants
-plant_label_100 = tk.Label(plant_frame_100, image=plant_img_open_100)
+plant_label_100 = tk.Label(plant_frame_100, image=plant_image(open_image_path_100))
 plant_label_100.pack()
 
 # Button to touch the plant for 100 plants
@@ -309,7 +300,7 @@ def live_update_custom():
 def touch_plant_custom():
     global current_energy_custom
     current_energy_custom = ENERGY_PER_PLANT / 600  # Convert mV to µW for 10 minutes
-    plant_label_custom.config(image=plant_img_closed_custom)
+    plant_label_custom.config(image=plant_image(close_image_path_custom))
     
     # Update the chart immediately to show the spike
     update_chart_custom()
@@ -321,14 +312,14 @@ def return_to_baseline_custom():
     global current_energy_custom
     current_energy_custom = BASELINE_ENERGY  # Return to baseline energy
     update_chart_custom()  # Update the chart to reflect the change
-    plant_label_custom.config(image=plant_img_open_custom)  # Revert image back
+    plant_label_custom.config(image=plant_image(open_image_path_custom))  # Revert image back
 
 # Create a frame for the customizable plants section
 plant_frame_custom = tk.Frame(content_frame)
 plant_frame_custom.grid(row=3, column=1, padx=10, pady=10)
 
 # Display initial plant image in a label for customizable plants
-plant_label_custom = tk.Label(plant_frame_custom, image=plant_img_open_custom)
+plant_label_custom = tk.Label(plant_frame_custom, image=plant_image(open_image_path_custom))
 plant_label_custom.pack()
 
 # Button to touch the plant for customizable plants
@@ -1,21 +1,50 @@
 # 01: Import necessary libraries
-from PIL import Image, ImageTk
+from startup_report import StartupTimer
+startup = StartupTimer()  # Set MIMOSA_STARTUP_REPORT=1 to print where startup time goes
 import tkinter as tk
 from tkinter import ttk
 import os
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import random
 import csv
 import time
 import math
+from plant_engine import PlantArray
+from spike_model import SpikeKernel
+from scheduler import TickScheduler
+from sim_worker import SimulationWorker
+from battery import Battery
+from conversion import default_chain
+from flywheel import FlywheelBank, MAX_RPM
+from data_logger import DataLogger
+from history_archive import HistoryArchive
+from history_pyramid import HistoryPyramid
+from sensor_ingest import SensorFeed, SensorIngest
+from image_cache import ImageCache, DEFAULT_SIZE
+from greenhouse import Greenhouse, SectionTotals
+from stimulation import StimulationScheduler
+from dashboard_panels import PanelConfig, PanelContext, PlantPanel, PanelRenderer, EnergyStore, plant_groups
 
 # Constants for energy levels and update intervals
 BASELINE_ENERGY = 0.5  # Baseline energy level in µW
 SPIKE_ENERGY = 1.5     # Energy spike level in µW
 UPDATE_INTERVAL = 1000  # Interval in ms for live updates
+RETURN_TO_BASELINE_DELAY = 3.0  # Seconds before a touched plant reopens
 ENERGY_PER_PLANT = 2    # Energy produced by one plant in mV every 10 minutes
-MAX_BATTERY_CAPACITY = 1000000  # Maximum battery capacity in µW
+MAX_BATTERY_CAPACITY = 1000000  # Maximum battery capacity in µJ (µW over one second)
+FLYWHEEL_INERTIA = 2.5e-8  # kg m^2, small wheel holding about 0.5 J at MAX_RPM
+FLYWHEEL_MAX_POWER = 1e-3  # Motor/generator rating in W
+SPIKE_RISE = 0.3   # Seconds, rise time constant of a touch spike
+SPIKE_DECAY = 1.0  # Seconds, decay time constant of a touch spike
+SPIKE_AMPLITUDE = SPIKE_ENERGY - BASELINE_ENERGY  # µW a touch adds to one plant's reading at its peak
+RESTING_NOISE = 0.1  # µW, std of one resting plant's reading around the baseline
+# Comma-separated sensor endpoints (tcp:HOST:PORT, udp:HOST:PORT, serial:PATH);
+# when set, charts and battery read the sensors instead of the simulated plants
+SENSOR_ENDPOINTS = [e for e in os.environ.get('MIMOSA_SENSORS', '').split(',') if e]
+GREENHOUSE_GRIDS = (2, 5)  # Rows and columns of 10x10 ft grids (1000 plants)
+CHART_WINDOW = 60  # Number of samples shown on each chart
+HISTORY_SECONDS = 24 * 60 * 60  # History kept per series (24 h at 1 Hz)
+BLIT_CHARTS = True  # Redraw only the line and annotation; False re-renders the whole figure
+
+startup.mark('imports')
 
 # 02: Initialize main window
 root = tk.Tk()
@@ -44,6 +73,10 @@ def update_scroll_region(event):
 
 content_frame.bind("<Configure>", update_scroll_region)
 
+# Single scheduler driving every live update, baseline return and the battery loop
+scheduler = TickScheduler(root)
+startup.mark('window shell')
+
 # 03: Define paths for open and closed plant images
 current_dir = os.path.dirname(os.path.abspath(__file__))
 open_image_path_1 = os.path.join(current_dir, "images/open_1.png")
@@ -53,365 +86,101 @@ close_image_path_100 = os.path.join(current_dir, "images/close_100.png")
 open_image_path_custom = os.path.join(current_dir, "images/open_custom.png")
 close_image_path_custom = os.path.join(current_dir, "images/close_custom.png")
 
-# Load, resize, and convert images for display
-def load_image(open_path, close_path):
-    try:
-        img_open = ImageTk.PhotoImage(Image.open(open_path).resize((200, 200)))
-        img_closed = ImageTk.PhotoImage(Image.open(close_path).resize((200, 200)))
-        return img_open, img_closed
-    except FileNotFoundError:
-        print(f"Error: Image files not found at {open_path} or {close_path}")
-        return None, None  # Use default placeholder images if needed
-
-plant_img_open_1, plant_img_closed_1 = load_image(open_image_path_1, close_image_path_1)
-plant_img_open_100, plant_img_closed_100 = load_image(open_image_path_100, close_image_path_100)
-plant_img_open_custom, plant_img_closed_custom = load_image(open_image_path_custom, close_image_path_custom)
+# Resized images come from the on-disk cache and are loaded on first display
+IMAGE_SIDES = (100, 150, 200, 250, 300)  # Square plant image sizes offered as the window is resized
+image_cache = ImageCache()
+image_size = DEFAULT_SIZE
+def plant_image(path):
+    return image_cache.get(path, image_size)
 
 # 04: Welcome label at the top
 welcome_label = tk.Label(content_frame, text="Welcome to the MIMOSA Energy SIMULATION", bg='lightgrey', font=("Arial", 20))
 welcome_label.grid(row=0, column=1, columnspan=5, pady=10)
 
-# 05: Function to simulate sensor data
-def get_sensor_data():
-    return random.uniform(BASELINE_ENERGY, SPIKE_ENERGY)
-
-# 06: Create figure and axis for Matplotlib chart for 1 plant
-fig_1, ax_1 = plt.subplots()
-canvas_chart_1 = FigureCanvasTkAgg(fig_1, master=content_frame)
-canvas_chart_1.get_tk_widget().grid(row=1, column=0, padx=10, pady=10)
-
-# Configure plot limits and styling for 1 plant
-ax_1.set_title('Energy Production from 1 Plant (µW)', color='blue')
-ax_1.set_xlabel('Time (seconds)', color='green')
-ax_1.set_ylabel('Energy (µW)', color='green')
-ax_1.set_ylim(0, 2)
-ax_1.grid(True, which='both', linestyle='--', linewidth=0.5)
-
-# Initialize plot line and data lists for 1 plant
-line_1, = ax_1.plot([], [], lw=2, color='red', label='Energy Production')
-ax_1.legend(loc='upper right')
-
-# Initialize data lists for time and energy for 1 plant
-time_data_1 = []
-energy_data_1 = []
-
-# 07: Function to update chart with new energy value for 1 plant
-def update_chart_1():
-    global time_data_1, energy_data_1, current_energy_1, last_annotation_1
-    time_data_1.append(len(time_data_1))
-    energy_data_1.append(current_energy_1)
-
-    if len(time_data_1) > 60:
-        time_data_1, energy_data_1 = time_data_1[-60:], energy_data_1[-60:]
-
-    line_1.set_data(range(len(time_data_1)), energy_data_1)
-    ax_1.set_xlim(0, 60)
-
-    if 'last_annotation_1' in globals() and last_annotation_1:
-        last_annotation_1.remove()
-
-    if current_energy_1 > BASELINE_ENERGY:
-        y_offset = 15 if current_energy_1 < 1.5 else -15
-        last_annotation_1 = ax_1.annotate(f'{current_energy_1:.2f} µW',
-                                      xy=(len(time_data_1)-1, current_energy_1),
-                                      textcoords='offset points',
-                                      xytext=(0, y_offset),
-                                      ha='center',
-                                      color='blue',
-                                      fontsize=8,
-                                      bbox=dict(boxstyle="round,pad=0.3", edgecolor="blue", facecolor="lightyellow"))
-    else:
-        last_annotation_1 = None
-
-    canvas_chart_1.draw()
-
-# 08: Initialize energy level for 1 plant
-current_energy_1 = BASELINE_ENERGY
-update_chart_1()  # Initial update to set base level
-
-# 09: Function to simulate continuous energy readings for 1 plant
-def live_update_1():
-    global current_energy_1
-    if update_active_1:
-        current_energy_1 = get_sensor_data()
-        update_chart_1()
-        root.after(UPDATE_INTERVAL, live_update_1)
-    else:
-        current_energy_1 = BASELINE_ENERGY
-        plant_label_1.config(image=plant_img_closed_1)
-
-# 10: Function to handle plant touch for 1 plant
-def touch_plant_1():
-    global current_energy_1
-    current_energy_1 = ENERGY_PER_PLANT / 600  # Convert mV to µW for 10 minutes
-    plant_label_1.config(image=plant_img_closed_1)
-    
-    # Update the chart immediately to show the spike
-    update_chart_1()
-    
-    # Schedule to return to baseline energy after 3 seconds
-    root.after(3000, return_to_baseline_1)  # Return to baseline after 3 seconds
-
-def return_to_baseline_1():
-    global current_energy_1
-    current_energy_1 = BASELINE_ENERGY  # Return to baseline energy
-    update_chart_1()  # Update the chart to reflect the change
-    plant_label_1.config(image=plant_img_open_1)  # Revert image back
-
-# Create a frame for the 1 plant section
-plant_frame_1 = tk.Frame(content_frame)
-plant_frame_1.grid(row=1, column=1, padx=10, pady=10)
-
-# Display initial plant image in a label for 1 plant
-plant_label_1 = tk.Label(plant_frame_1, image=plant_img_open_1)
-plant_label_1.pack()
-
-# Button to touch the plant for 1 plant
-touch_button_1 = tk.Button(plant_frame_1, text="Touch Plant 1", command=touch_plant_1)
-touch_button_1.pack()
-
-# 11: Create figure and axis for Matplotlib chart for 100 plants
-fig_100, ax_100 = plt.subplots()
-canvas_chart_100 = FigureCanvasTkAgg(fig_100, master=content_frame)
-canvas_chart_100.get_tk_widget().grid(row=2, column=0, padx=10, pady=10)
-
-# Configure plot limits and styling for 100 plants
-ax_100.set_title('Energy Production from 100 Plants (µW)', color='blue')
-ax_100.set_xlabel('Time (seconds)', color='green')
-ax_100.set_ylabel('Energy (µW)', color='green')
-ax_100.set_ylim(0, 200)
-ax_100.grid(True, which='both', linestyle='--', linewidth=0.5)
-
-# Initialize plot line and data lists for 100 plants
-line_100, = ax_100.plot([], [], lw=2, color='purple', label='100 Plants Energy Production')
-ax_100.legend(loc='upper right')
-
-# Initialize data lists for time and energy for 100 plants
-time_data_100 = []
-energy_data_100 = []
-
-# 12: Function to update chart with new energy value for 100 plants
-def update_chart_100():
-    global time_data_100, energy_data_100, current_energy_100, last_annotation_100
-    time_data_100.append(len(time_data_100))
-    energy_data_100.append(current_energy_100 * 100)  # Scale for 100 plants
-
-    if len(time_data_100) > 60:
-        time_data_100, energy_data_100 = time_data_100[-60:], energy_data_100[-60:]
-
-    line_100.set_data(range(len(time_data_100)), energy_data_100)
-    ax_100.set_xlim(0, max(60, len(time_data_100)))
-
-    canvas_chart_100.draw()
-
-# 13: Function to simulate continuous energy readings for 100 plants
-def live_update_100():
-    global current_energy_100
-    if update_active_100:
-        current_energy_100 = get_sensor_data()
-        update_chart_100()
-        root.after(UPDATE_INTERVAL, live_update_100)
-
-# 14: Function to handle plant touch for 100 plants
-def touch_plant_100():
-    global current_energy_100
-    current_energy_100 = ENERGY_PER_PLANT / 600  # Convert mV to µW for 10 minutes
-    plant_label_100.config(image=plant_img_closed_100)
-    
-    # Update the chart immediately to show the spike
-    update_chart_100()
-    
-    # Schedule to return to baseline energy after 3 seconds
-    root.after(3000, return_to_baseline_100)  # Return to baseline after 3 seconds
-
-def return_to_baseline_100():
-    global current_energy_100
-    current_energy_100 = BASELINE_ENERGY  # Return to baseline energy
-    update_chart_100()  # Update the chart to reflect the change
-    plant_label_100.config(image=plant_img_open_100)  # Revert image back
-
-# Create a frame for the 100 plants section
-plant_frame_100 = tk.Frame(content_frame)
-plant_frame_100.grid(row=2, column=1, padx=10, pady=10)
-
-# Display initial plant image in a label for 100 plants
-plant_label_100 = tk.Label(plant_frame_100, image=plant_img_open_100)
-plant_label_100.pack()
-
-# Button to touch the plant for 100 plants
-touch_button_100 = tk.Button(plant_frame_100, text="Touch 100 Plants", command=touch_plant_100)
-touch_button_100.pack()
-
-# 15: Create figure and axis for customizable input plants
-fig_custom, ax_custom = plt.subplots()
-canvas_chart_custom = FigureCanvasTkAgg(fig_custom, master=content_frame)
-canvas_chart_custom.get_tk_widget().grid(row=3, column=0, padx=10, pady=10)
-
-# Configure plot limits and styling for customizable plants
-ax_custom.set_title('Energy Production from Custom Plants (µW)', color='blue')
-ax_custom.set_xlabel('Time (seconds)', color='green')
-ax_custom.set_ylabel('Energy (µW)', color='green')
-ax_custom.set_ylim(0, 20000)  # Set y-axis limit for custom plants
-ax_custom.grid(True, which='both', linestyle='--', linewidth=0.5)
-
-# Initialize plot line and data lists for customizable plants
-line_custom, = ax_custom.plot([], [], lw=2, color='orange', label='Custom Plants Energy Production')
-ax_custom.legend(loc='upper right')
-
-# Initialize data lists for time and energy for customizable plants
-time_data_custom = []
-energy_data_custom = []
-
-# Initialize energy level for customizable plants
-current_energy_custom = BASELINE_ENERGY  # Initialize the energy level for custom plants
-
-# Create a frame for the customizable plants section
-plant_frame_custom = tk.Frame(content_frame)
-plant_frame_custom.grid(row=3, column=1, padx=10, pady=10)
-
-# Entry for customizable plant count
-custom_plant_count = tk.IntVar(value=1)  # Default to 1 plant
-custom_plant_entry = tk.Entry(plant_frame_custom, textvariable=custom_plant_count)
-custom_plant_entry.pack(side=tk.LEFT)
-custom_plant_label = tk.Label(plant_frame_custom, text="Enter number of custom plants:")
-custom_plant_label.pack(side=tk.LEFT)
-
-# Function to update chart with new energy value for customizable plants
-def update_chart_custom():
-    global time_data_custom, energy_data_custom, current_energy_custom, last_annotation_custom
-    time_data_custom.append(len(time_data_custom))
-    energy_data_custom.append(current_energy_custom * custom_plant_count.get())  # Scale for custom plants
-
-    if len(time_data_custom) > 60:
-        time_data_custom, energy_data_custom = time_data_custom[-60:], energy_data_custom[-60:]
-
-    line_custom.set_data(range(len(time_data_custom)), energy_data_custom)
-
-    # Dynamically set the y-axis limit based on the number of custom plants
-    max_energy = custom_plant_count.get() * ENERGY_PER_PLANT / 600  # Maximum energy in µW
-    ax_custom.set_ylim(0, max(20000, max_energy * 1.2))  # Set a minimum of 200 or 20% more than max energy
-
-    ax_custom.set_xlim(0, max(60, len(time_data_custom)))
-
-    canvas_chart_custom.draw()
-
-# Function to update the graph when the custom plant count changes
-def update_graph_on_change(*args):
-    update_chart_custom()  # Update the graph with the new count
-
-# Trace changes to the custom plant count
-custom_plant_count.trace("w", update_graph_on_change)
-
-# 17: Function to simulate continuous energy readings for customizable plants
-def live_update_custom():
-    global current_energy_custom
-    if update_active_custom:
-        current_energy_custom = get_sensor_data()
-        update_chart_custom()
-        root.after(UPDATE_INTERVAL, live_update_custom)
-
-# 18: Function to handle plant touch for customizable plants
-def touch_plant_custom():
-    global current_energy_custom
-    current_energy_custom = ENERGY_PER_PLANT / 600  # Convert mV to µW for 10 minutes
-    plant_label_custom.config(image=plant_img_closed_custom)
-    
-    # Update the chart immediately to show the spike
-    update_chart_custom()
-    
-    # Schedule to return to baseline energy after 3 seconds
-    root.after(3000, return_to_baseline_custom)  # Return to baseline after 3 seconds
-
-def return_to_baseline_custom():
-    global current_energy_custom
-    current_energy_custom = BASELINE_ENERGY  # Return to baseline energy
-    update_chart_custom()  # Update the chart to reflect the change
-    plant_label_custom.config(image=plant_img_open_custom)  # Revert image back
-
-# Create a frame for the customizable plants section
-plant_frame_custom = tk.Frame(content_frame)
-plant_frame_custom.grid(row=3, column=1, padx=10, pady=10)
-
-# Display initial plant image in a label for customizable plants
-plant_label_custom = tk.Label(plant_frame_custom, image=plant_img_open_custom)
-plant_label_custom.pack()
-
-# Button to touch the plant for customizable plants
-touch_button_custom = tk.Button(plant_frame_custom, text="Touch Custom Plants", command=touch_plant_custom)
-touch_button_custom.pack()
-
-# Entry for customizable plant count
-custom_plant_count = tk.IntVar(value=1)  # Default to 1 plant
-custom_plant_entry = tk.Entry(plant_frame_custom, textvariable=custom_plant_count)
-custom_plant_entry.pack(side=tk.LEFT)
-custom_plant_label = tk.Label(plant_frame_custom, text="Enter number of custom plants:")
-custom_plant_label.pack(side=tk.LEFT)
-
-# 19: Start and stop controls for 1 plant
-update_active_1 = False  # Variable to control if updates are active
-
-def start_updates_1():
-    global update_active_1
-    update_active_1 = True  # Activate live updates for 1 plant
-    live_update_1()  # Start live updates for 1 plant
-
-def stop_updates_1():
-    global update_active_1
-    update_active_1 = False  # Deactivate live updates for 1 plant
-
-# Create Start and Stop buttons for 1-plant simulation
-button_frame_1 = tk.Frame(content_frame)
-button_frame_1.grid(row=4, column=0, columnspan=2, pady=10)
-
-start_button_1 = tk.Button(button_frame_1, text="Start 1 Plant", command=start_updates_1)
-start_button_1.pack(side=tk.LEFT, padx=10)
-
-stop_button_1 = tk.Button(button_frame_1, text="Stop 1 Plant", command=stop_updates_1)
-stop_button_1.pack(side=tk.LEFT, padx=10)
-
-# 20: Start and stop controls for 100 plants
-update_active_100 = False  # Variable to control if updates are active
-
-def start_updates_100():
-    global update_active_100
-    update_active_100 = True  # Activate live updates for 100 plants
-    live_update_100()  # Start live updates for 100 plants
-
-def stop_updates_100():
-    global update_active_100
-    update_active_100 = False  # Deactivate live updates for 100 plants
-
-# Create Start and Stop buttons for 100-plant simulation
-button_frame_100 = tk.Frame(content_frame)
-button_frame_100.grid(row=5, column=0, columnspan=2, pady=10)
-
-start_button_100 = tk.Button(button_frame_100, text="Start 100 Plants", command=start_updates_100)
-start_button_100.pack(side=tk.LEFT, padx=10)
-
-stop_button_100 = tk.Button(button_frame_100, text="Stop 100 Plants", command=stop_updates_100)
-stop_button_100.pack(side=tk.LEFT, padx=10)
-
-# 21: Start and stop controls for customizable plants
-update_active_custom = False  # Variable to control if updates are active
-
-def start_updates_custom():
-    global update_active_custom
-    update_active_custom = True  # Activate live updates for custom plants
-    live_update_custom()  # Start live updates for custom plants
-
-def stop_updates_custom():
-    global update_active_custom
-    update_active_custom = False  # Deactivate live updates for custom plants
-
-# Create Start and Stop buttons for customizable plant simulation
-button_frame_custom = tk.Frame(content_frame)
-button_frame_custom.grid(row=6, column=0, columnspan=2, pady=10)
-
-start_button_custom = tk.Button(button_frame_custom, text="Start Custom Plants", command=start_updates_custom)
-start_button_custom.pack(side=tk.LEFT, padx=10)
-
-stop_button_custom = tk.Button(button_frame_custom, text="Stop Custom Plants", command=stop_updates_custom)
-stop_button_custom.pack(side=tk.LEFT, padx=10)
+# 05: Plant groups shown on the dashboard, one panel each. Add entries here
+# to show more groups or greenhouse sections.
+PANELS = [
+    PanelConfig('1', 'Energy Production from 1 Plant (µW)', '1 Plant', 'Energy Production',
+                plants=1, ylim=2, color='red', open_image=open_image_path_1, close_image=close_image_path_1,
+                annotate=True),
+    PanelConfig('100', 'Energy Production from 100 Plants (µW)', '100 Plants', '100 Plants Energy Production',
+                plants=100, ylim=200, color='purple', open_image=open_image_path_100,
+                close_image=close_image_path_100),
+    PanelConfig('custom', 'Energy Production from Custom Plants (µW)', 'Custom Plants',
+                'Custom Plants Energy Production', plants=1, ylim=20000, color='orange',
+                open_image=open_image_path_custom, close_image=close_image_path_custom,
+                resizable=True, max_plants=100000),
+]
+CHARGE_GROUP = 'custom'  # Group whose energy charges the battery
+
+# Plant simulation engine shared by all dashboards
+# The greenhouse comes first, then each panel reads its own slice of plants
+greenhouse = Greenhouse(*GREENHOUSE_GRIDS)
+PLANT_GROUPS = {'greenhouse': (greenhouse.start, greenhouse.stop), **plant_groups(PANELS, greenhouse.stop)}
+
+# Readings are the baseline plus the superposed spikes of recent touches
+engine = PlantArray(max(stop for _, stop in PLANT_GROUPS.values()), BASELINE_ENERGY, SPIKE_ENERGY,
+                    SPIKE_AMPLITUDE, kernel=SpikeKernel(SPIKE_RISE, SPIKE_DECAY), noise=RESTING_NOISE)
+
+# The engine, battery and flywheel run on a worker thread; Tk only reads its latest snapshot.
+# The charge group's output reaches the battery through the piezo -> capacitor -> rectifier -> dynamo chain.
+battery = Battery(MAX_BATTERY_CAPACITY * 1e-6, level=MAX_BATTERY_CAPACITY * 1e-6 * 0.1)  # J, start at 10%
+flywheel = FlywheelBank(inertia=FLYWHEEL_INERTIA, max_charge_power=FLYWHEEL_MAX_POWER,
+                        max_discharge_power=FLYWHEEL_MAX_POWER)
+sensor_feed, sensor_ingest = None, None
+if SENSOR_ENDPOINTS:
+    sensor_feed = SensorFeed(engine.count)  # Sensor id = plant index in the engine
+    sensor_ingest = SensorIngest(sensor_feed)
+    sensor_ingest.start(SENSOR_ENDPOINTS)
+sim_worker = SimulationWorker(engine, PLANT_GROUPS, CHARGE_GROUP, battery, flywheel,
+                              sections=SectionTotals(greenhouse, engine), chain=default_chain(), source=sensor_feed)
+sim_worker.start()
+
+startup.mark('simulation worker started')
+
+# 06: One data store and one renderer shared by every panel. Panels scrolled
+# out of view are not rendered; charts are built when first visible.
+energy_store = EnergyStore([config.key for config in PANELS], HISTORY_SECONDS)
+# Every sample is also kept in a memory-mapped archive the charts can scroll back through.
+# After PANELS changes, archives with the old columns are moved aside and new ones started.
+HISTORY_COLUMNS = [*(f"energy_{config.key}" for config in PANELS), "battery_percent", "flywheel_rpm"]
+history = HistoryArchive(os.path.join(current_dir, "logs", "history"), HISTORY_COLUMNS, rollover=True)
+# Min / max / mean per 1 s, 1 min and 1 h bucket, so zoomed-out charts stay as cheap as 60 points
+history_pyramid = HistoryPyramid(os.path.join(current_dir, "logs", "pyramid"), HISTORY_COLUMNS, rollover=True)
+history_pyramid.backfill(history)  # Samples archived while the pyramid was not kept
+renderer = PanelRenderer(root, canvas, energy_store, CHART_WINDOW, blit=BLIT_CHARTS, startup=startup,
+                         history=history, pyramid=history_pyramid)
+
+# Re-render panels that scroll into view
+def on_scroll(first, last):
+    scrollbar.set(first, last)
+    renderer.schedule_refresh()
+
+canvas.configure(yscrollcommand=on_scroll)
+canvas.bind("<Configure>", renderer.schedule_refresh, add="+")
+
+panel_context = PanelContext(sim_worker, energy_store, renderer, scheduler, plant_image,
+                             UPDATE_INTERVAL / 1000, RETURN_TO_BASELINE_DELAY, SPIKE_AMPLITUDE,
+                             BASELINE_ENERGY)
+panels = [PlantPanel(content_frame, row, config, PLANT_GROUPS[config.key], panel_context)
+          for row, config in enumerate(PANELS, start=1)]
+
+# Plant images follow the window height: the largest offered size up to a
+# quarter of it, resized once per size into the disk cache
+def resize_plant_images():
+    global image_size
+    side = max([s for s in IMAGE_SIDES if s <= root.winfo_height() // 4], default=IMAGE_SIDES[0])
+    if (side, side) != image_size:
+        image_size = (side, side)
+        image_cache.clear()
+        for panel in panels:
+            panel.show_image()
+
+def on_window_resize(event):
+    if event.widget is root:
+        scheduler.after('image_resize', 0.2, resize_plant_images)  # Once the drag settles
+
+root.bind("<Configure>", on_window_resize, add="+")
 
 # 22: Create a side panel for battery and flywheel representation
 side_panel = tk.Frame(root, width=250,height=630, bg='lightgrey')
@@ -425,7 +194,6 @@ label.pack(pady=10)
 
 
 # Battery Level Bar
-battery_level = MAX_BATTERY_CAPACITY * 0.1  # Start at 10% of max capacity
 battery_level_bar = ttk.Progressbar(side_panel, orient="vertical", length=300, mode="determinate")
 battery_level_bar.pack(pady=20)
 battery_level_bar.config(maximum=MAX_BATTERY_CAPACITY)
@@ -439,40 +207,189 @@ battery_percentage_label.pack(pady=10)
 flywheel_speed_label = tk.Label(side_panel, text="Flywheel Speed: 0 RPM", font=("Arial", 12))
 flywheel_speed_label.pack(pady=10)
 
+# Chart frame-time counter
+render_stats_label = tk.Label(side_panel, text=renderer.timer.summary(), font=("Arial", 10))
+render_stats_label.pack(pady=5)
+
+# History scroll: minutes back from the newest archived sample, 0 follows the live data
+history_scale = tk.Scale(side_panel, from_=0, to=0, orient=tk.HORIZONTAL, length=200,
+                         label="History (minutes back)", showvalue=True)
+history_scale.pack(pady=5)
+
+def scroll_history(value):
+    minutes = int(float(value))
+    renderer.scroll_history(None if minutes == 0 else history.last_time - minutes * 60)
+
+def update_history_scale():
+    if len(history):
+        span = history.last_time - history.rows(0, 1)['time'][0]
+        history_scale.config(to=int(span // 60))
+
+history_scale.config(command=scroll_history)
+update_history_scale()
+
+# Chart zoom: seconds shown per chart, drawn from the pyramid level matching the chart width
+CHART_SPANS = {f"Last {CHART_WINDOW} samples": None, "1 hour": 3600, "1 day": 86400,
+               "1 week": 7 * 86400, "30 days": 30 * 86400}
+chart_span = tk.StringVar(value=next(iter(CHART_SPANS)))
+tk.Label(side_panel, text="Chart span", font=("Arial", 10)).pack()
+tk.OptionMenu(side_panel, chart_span, *CHART_SPANS,
+              command=lambda name: renderer.zoom(CHART_SPANS[name])).pack(pady=5)
+
 # 25: Flywheel Animation
 flywheel_canvas = tk.Canvas(side_panel, width=100, height=100, bg='white')
 flywheel_canvas.pack(pady=20)
 
 # Function to update battery level and flywheel speed
 def update_battery_and_flywheel():
-    global battery_level, current_energy_custom
-    # Update battery level based on energy produced
-    battery_level += current_energy_custom * custom_plant_count.get()  # Add energy from custom plants
-    if battery_level > MAX_BATTERY_CAPACITY:
-        battery_level = MAX_BATTERY_CAPACITY  # Cap battery level
+    # Battery integration happens on the worker thread; just show its latest state
+    snapshot = sim_worker.latest
+    battery_level = snapshot.battery_fraction * MAX_BATTERY_CAPACITY  # Back to µJ for the bar
 
     # Update battery level bar and percentage label
     battery_level_bar.config(value=battery_level)
     battery_percentage = (battery_level / MAX_BATTERY_CAPACITY) * 100
     battery_percentage_label.config(text=f"Battery: {int(battery_percentage)}%")
 
-    # Calculate flywheel speed based on battery level
-    flywheel_speed = (battery_level / MAX_BATTERY_CAPACITY) * 6000  # Scale speed
+    # Flywheel speed from the flywheel model
+    flywheel_speed = snapshot.flywheel_speed
     flywheel_speed_label.config(text=f"Flywheel Speed: {int(flywheel_speed)} RPM")
 
     # Draw spinning flywheel
     flywheel_canvas.delete("all")
-    flywheel_angle = (flywheel_speed / 6000) * 360  # Calculate angle based on speed
+    flywheel_angle = (flywheel_speed / MAX_RPM) * 360  # Calculate angle based on speed
     flywheel_canvas.create_oval(10, 10, 90, 90, fill='blue', outline='black')
     flywheel_end_x = 50 + 40 * math.cos(math.radians(flywheel_angle))
     flywheel_end_y = 50 + 40 * math.sin(math.radians(flywheel_angle))
     flywheel_canvas.create_line(50, 50, flywheel_end_x, flywheel_end_y, fill='yellow', width=3)
 
-    # Schedule the next update
-    root.after(UPDATE_INTERVAL, update_battery_and_flywheel)
+    render_stats_label.config(text=renderer.timer.summary())
 
 # Start updating battery and flywheel
-update_battery_and_flywheel()
+scheduler.every('battery', UPDATE_INTERVAL / 1000, update_battery_and_flywheel)
+
+# 26: Greenhouse drill-down: greenhouse -> grids -> sections. The worker
+# publishes cached per-section and per-grid sums; rows are only inserted when
+# their parent is expanded and only expanded rows are refreshed.
+greenhouse_tree = ttk.Treeview(side_panel, columns=("energy",), height=10)
+greenhouse_tree.heading("#0", text="Greenhouse")
+greenhouse_tree.heading("energy", text="Energy (µW)")
+greenhouse_tree.column("#0", width=150)
+greenhouse_tree.column("energy", width=90, anchor="e")
+greenhouse_tree.pack(pady=10)
+greenhouse_tree.insert("", "end", iid="total", text=f"Greenhouse ({greenhouse.count} plants)")
+greenhouse_tree.insert("total", "end", iid="total/pending")  # Shows the expand arrow
+
+def expand_greenhouse_row(event):
+    item = greenhouse_tree.focus()
+    if not greenhouse_tree.exists(f"{item}/pending"):
+        return  # Children already inserted
+    greenhouse_tree.delete(f"{item}/pending")
+    if item == "total":
+        for grid in range(greenhouse.grid_count):
+            row, col = greenhouse.grid_position(grid)
+            greenhouse_tree.insert("total", "end", iid=f"grid:{grid}", text=f"Grid {row + 1}-{col + 1}")
+            greenhouse_tree.insert(f"grid:{grid}", "end", iid=f"grid:{grid}/pending")
+    else:
+        grid = int(item.split(":")[1])
+        for section in greenhouse.sections_of_grid(grid):
+            row, col = greenhouse.section_position(section)
+            greenhouse_tree.insert(item, "end", iid=f"section:{section}", text=f"Section {row + 1}-{col + 1}")
+    update_greenhouse_tree()
+
+greenhouse_tree.bind("<<TreeviewOpen>>", expand_greenhouse_row)
+
+def update_greenhouse_tree():
+    reading = sim_worker.latest.greenhouse
+    if reading is None:
+        return
+    greenhouse_tree.set("total", "energy", f"{reading.total:.1f}")
+    if not greenhouse_tree.item("total", "open"):
+        return
+    for grid in range(greenhouse.grid_count):
+        item = f"grid:{grid}"
+        greenhouse_tree.set(item, "energy", f"{reading.grids[grid]:.1f}")
+        if greenhouse_tree.item(item, "open"):
+            for section in greenhouse.sections_of_grid(grid):
+                greenhouse_tree.set(f"section:{section}", "energy", f"{reading.sections[section]:.2f}")
+
+# Touch every plant under the selected row
+def touch_greenhouse_selection():
+    for item in greenhouse_tree.selection():
+        kind, _, index = item.partition(":")
+        if kind == "grid":
+            sim_worker.touch_range(*greenhouse.grid_range(int(index)))
+        elif kind == "section":
+            sim_worker.touch_range(*greenhouse.section_range(int(index)))
+        elif kind == "total":
+            sim_worker.touch_range(greenhouse.start, greenhouse.stop)
+
+touch_greenhouse_button = tk.Button(side_panel, text="Touch Selection", command=touch_greenhouse_selection)
+touch_greenhouse_button.pack(pady=5)
+
+# Automatic vibrator firing across the greenhouse sections, staggered by the worker's scheduler
+auto_stimulation = tk.BooleanVar(value=False)
+stimulator = None
+
+def toggle_auto_stimulation():
+    global stimulator
+    if auto_stimulation.get():
+        stimulator = StimulationScheduler(engine, greenhouse.start, greenhouse.stop, sim_worker.dt,
+                                          greenhouse.plants_per_section)
+    else:
+        stimulator = None
+    sim_worker.set_stimulator(stimulator)
+
+auto_stimulation_check = tk.Checkbutton(side_panel, text="Auto Stimulation", variable=auto_stimulation,
+                                        command=toggle_auto_stimulation, bg='lightgrey')
+auto_stimulation_check.pack()
+stimulation_label = tk.Label(side_panel, text="", font=("Arial", 10))
+stimulation_label.pack(pady=5)
+
+def update_stimulation_label():
+    if stimulator is None:
+        stimulation_label.config(text="Auto stimulation off")
+    elif not stimulator.enabled:
+        stimulation_label.config(text="Stimulation costs more than it returns")
+    else:
+        stimulation_label.config(text=f"Every {stimulator.interval:.0f} s: {stimulator.fired} pulses, "
+                                      f"net {stimulator.net * 1e6:.2f} µJ")
+
+scheduler.every('greenhouse', UPDATE_INTERVAL / 1000, update_greenhouse_tree)
+scheduler.every('stimulation', UPDATE_INTERVAL / 1000, update_stimulation_label)
+
+# Log every sample on a background thread; files are rotated and old ones dropped
+data_logger = DataLogger(os.path.join(current_dir, "logs"), ["time", *HISTORY_COLUMNS])
+data_logger.start()
+
+def log_sample():
+    snapshot = sim_worker.latest
+    now = time.time()
+    values = (*(snapshot.energy[config.key] for config in PANELS),
+              snapshot.battery_fraction * 100, snapshot.flywheel_speed)
+    data_logger.log((f"{now:.3f}", *(f"{value:.4f}" for value in values[:-2]),
+                     f"{values[-2]:.3f}", f"{values[-1]:.1f}"))
+    history.append(now, values)
+    history_pyramid.append(now, values)
+    if renderer.span is not None:
+        renderer.invalidate_all()  # Zoomed charts are not redrawn by the per-panel samples
+
+scheduler.every('logger', UPDATE_INTERVAL / 1000, log_sample)
+scheduler.every('history_scale', 60, update_history_scale)
+
+# Stop the simulation worker and the logger together with the window
+def on_close():
+    sim_worker.stop()
+    if sensor_ingest is not None:
+        sensor_ingest.stop()
+    data_logger.stop(timeout=2)
+    history.close()
+    history_pyramid.close()
+    root.destroy()
+
+root.protocol("WM_DELETE_WINDOW", on_close)
+startup.mark('widgets built')
+root.after_idle(lambda: startup.mark('window shown'))
 
 # Last block
 root.mainloop()
\ No newline at end of file
@@ -0,0 +1,181 @@
+# Headless simulation engine for an array of Mimosa plants.
+# Holds per-plant state in NumPy arrays so that every plant in the greenhouse
+# is advanced in one batched step. No Tkinter / matplotlib imports here, the
+# dashboards only read from the engine.
+from collections import deque
+import numpy as np
+from spike_model import SpikeEvents
+
+# Defaults match the constants used by the dashboards
+BASELINE_ENERGY = 0.5     # Baseline energy level in µW
+SPIKE_ENERGY = 1.5        # Upper bound of the resting reading in µW
+ENERGY_PER_PLANT = 2      # Energy produced by one plant in mV every 10 minutes
+REFRACTORY_TIME = 3.0     # Seconds a plant stays closed after a touch
+
+
+class PlantArray:
+    def __init__(self, count, baseline=BASELINE_ENERGY, spike=SPIKE_ENERGY,
+                 touch_energy=ENERGY_PER_PLANT / 600, refractory_time=REFRACTORY_TIME,
+                 seed=None, kernel=None, noise=0.0):
+        self.baseline = baseline
+        self.spike = spike
+        self.touch_energy = touch_energy
+        self.refractory_time = refractory_time
+        self.rng = np.random.default_rng(seed)
+        self.time = 0.0
+        self.count = 0
+        self.closed = np.zeros(0, dtype=bool)           # True while the leaves are folded
+        self.reopen_at = np.zeros(0, dtype=np.float64)   # Engine time at which the plant reopens
+        self.amplitude = np.zeros(0, dtype=np.float32)   # Energy reading of a closed plant in µW
+        self.closed_count = 0
+        self.next_reopen = np.inf  # Earliest reopen time, lets step() skip idle ticks
+        # Touches in the order they reopen: (reopen time, start, stop, indices or None)
+        self._pending = deque()
+        # With a spike_model.SpikeKernel, readings are the baseline plus the
+        # superposed spikes of recent touches instead of random draws
+        self.spikes = None if kernel is None else SpikeEvents(kernel)
+        self.noise = noise  # With a kernel: std of one plant's reading around the baseline in µW
+        self._watchers = []  # Change logs handed out by watch()
+        self.resize(count)
+
+    # Log of state changes: receives (start, stop, indices) for every range
+    # (indices None) or set of plants that closed, reopened or was resized,
+    # so caches such as greenhouse.SectionTotals never rescan the arrays
+    def watch(self):
+        log = deque()
+        self._watchers.append(log)
+        return log
+
+    def _changed(self, start, stop, indices=None):
+        for log in self._watchers:
+            log.append((start, stop, indices))
+
+    # Grow or shrink the array, keeping the state of the plants that remain
+    def resize(self, count):
+        count = max(int(count), 0)
+        if count == self.count:
+            return
+        keep = min(count, self.count)
+        closed = np.zeros(count, dtype=bool)
+        reopen_at = np.zeros(count, dtype=np.float64)
+        amplitude = np.zeros(count, dtype=np.float32)
+        closed[:keep] = self.closed[:keep]
+        reopen_at[:keep] = self.reopen_at[:keep]
+        amplitude[:keep] = self.amplitude[:keep]
+        self.closed, self.reopen_at, self.amplitude = closed, reopen_at, amplitude
+        self._changed(keep, max(count, self.count))
+        self.count = count
+        self.closed_count = int(np.count_nonzero(closed))
+
+    # Close the plants in [start, stop) and arm their refractory timers
+    def touch(self, start=0, stop=None):
+        stop = self.count if stop is None else min(stop, self.count)
+        if start >= stop:
+            return
+        self.closed_count += int(stop - start - np.count_nonzero(self.closed[start:stop]))
+        self.closed[start:stop] = True
+        self.reopen_at[start:stop] = self.time + self.refractory_time
+        self.amplitude[start:stop] = self.touch_energy
+        self._arm(start, stop, None, self.touch_energy)
+        self._changed(start, stop)
+
+    # Close an arbitrary set of plant indices. amplitude (scalar or one per
+    # index) overrides the spike reading, e.g. for partly recovered plants.
+    def touch_indices(self, indices, amplitude=None):
+        indices, first = np.unique(np.asarray(indices, dtype=np.intp), return_index=True)  # Duplicates would skew closed_count
+        if indices.size == 0:
+            return
+        if amplitude is None:
+            amplitude = self.touch_energy
+        elif np.ndim(amplitude):
+            amplitude = np.asarray(amplitude)[first]
+        self.closed_count += int(indices.size - np.count_nonzero(self.closed[indices]))
+        self.closed[indices] = True
+        self.reopen_at[indices] = self.time + self.refractory_time
+        self.amplitude[indices] = amplitude
+        self._arm(0, 0, indices, amplitude)
+        self._changed(0, 0, indices)
+
+    # Queue a touch for reopening and record its spike event
+    def _arm(self, start, stop, indices, amplitude):
+        reopen = self.time + self.refractory_time
+        self._pending.append((reopen, start, stop, indices))  # Refractory time is fixed, so the queue stays sorted
+        self.next_reopen = min(self.next_reopen, reopen)
+        if self.spikes is not None:
+            if indices is None:
+                self.spikes.add(self.time, start, stop, amplitude)
+            else:
+                self.spikes.add(self.time, indices, indices + 1, amplitude)
+
+    # Advance every plant by dt seconds.
+    # Timers are stored as absolute reopen times and touches are queued in
+    # reopen order, so a tick only visits the plants of the touches that are
+    # due: O(1) when idle and O(touched plants) otherwise, never a pass over
+    # the whole array.
+    def step(self, dt):
+        self.time += dt
+        if self.spikes is not None:
+            self.spikes.prune(self.time)
+        if self.time < self.next_reopen:
+            return
+        pending = self._pending
+        while pending and pending[0][0] <= self.time:
+            _, start, stop, indices = pending.popleft()
+            # A plant touched again since has a later reopen time and stays closed
+            if indices is None:
+                stop = min(stop, self.count)
+                due = start + np.flatnonzero(self.closed[start:stop] & (self.reopen_at[start:stop] <= self.time))
+            else:
+                indices = indices[indices < self.count]  # The array may have shrunk
+                due = indices[self.closed[indices] & (self.reopen_at[indices] <= self.time)]
+            if due.size:
+                self.closed[due] = False
+                self.amplitude[due] = 0
+                self.closed_count -= due.size
+                self._changed(0, 0, due)
+        self.next_reopen = pending[0][0] if pending else np.inf
+
+    # Seconds left until each plant in [start, stop) reopens
+    def refractory(self, start=0, stop=None):
+        remaining = self.reopen_at[start:stop] - self.time
+        return np.where(self.closed[start:stop], np.maximum(remaining, 0), 0)
+
+    # Aggregate energy reading for plants in [start, stop) in µW.
+    # Open plants give a uniform reading in [baseline, spike]; for many plants
+    # the sum of those draws is sampled from its normal approximation instead
+    # of drawing one number per plant. With a spike kernel every plant reads
+    # the baseline plus its spikes, summed over the live touch events, plus
+    # resting noise drawn once for the whole range.
+    def energy(self, start=0, stop=None):
+        stop = self.count if stop is None else min(stop, self.count)
+        if start >= stop:
+            return 0.0
+        if self.spikes is not None:
+            energy = (stop - start) * self.baseline + self.spikes.energy(self.time, start, stop)
+            if self.noise:
+                energy = max(energy + self.rng.normal(0, self.noise * (stop - start) ** 0.5), 0.0)
+            return energy
+        if self.closed_count:
+            closed = self.closed[start:stop]
+            n_closed = int(np.count_nonzero(closed))
+            spike_total = float(self.amplitude[start:stop].sum(dtype=np.float64))
+        else:
+            n_closed, spike_total = 0, 0.0
+        return spike_total + self._resting_energy(stop - start - n_closed)
+
+    def _resting_energy(self, n_open):
+        if n_open <= 0:
+            return 0.0
+        if n_open < 32:
+            return float(self.rng.uniform(self.baseline, self.spike, n_open).sum())
+        width = self.spike - self.baseline
+        mean = n_open * (self.baseline + width / 2)
+        std = width * (n_open / 12) ** 0.5
+        low, high = n_open * self.baseline, n_open * self.spike
+        return float(min(max(self.rng.normal(mean, std), low), high))
+
+    # True if any plant in [start, stop) is currently closed
+    def is_closed(self, start=0, stop=None):
+        if self.closed_count == 0:
+            return False
+        return bool(self.closed[start:stop].any())
@@ -0,0 +1,53 @@
+# Uniform-grid spatial index over plant positions.
+# Each cell holds the indices of the plants whose centre falls inside it, so a
+# click or brush stroke only has to look at the few cells it overlaps instead
+# of every plant on the field. Insertion is O(1), which keeps the index cheap
+# to maintain as plants are added one at a time.
+import math
+
+
+class SpatialGrid:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}  # (col, row) -> list of (index, x, y)
+        self.count = 0
+
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def insert(self, index, x, y):
+        self.cells.setdefault(self._cell(x, y), []).append((index, x, y))
+        self.count += 1
+
+    def clear(self):
+        self.cells.clear()
+        self.count = 0
+
+    # Entries (index, x, y) in the cells overlapped by the circle at (x, y)
+    def candidates(self, x, y, radius):
+        size = self.cell_size
+        col_min, col_max = int((x - radius) // size), int((x + radius) // size)
+        row_min, row_max = int((y - radius) // size), int((y + radius) // size)
+        found = []
+        for col in range(col_min, col_max + 1):
+            for row in range(row_min, row_max + 1):
+                cell = self.cells.get((col, row))
+                if cell:
+                    found.extend(cell)
+        return found
+
+    # Indices of plants whose centre is within radius of (x, y)
+    def query(self, x, y, radius):
+        limit = radius * radius
+        return [i for i, px, py in self.candidates(x, y, radius)
+                if (px - x) ** 2 + (py - y) ** 2 < limit]
+
+    # Plants hit by a brush stroke from (x0, y0) to (x1, y1) with the given radius
+    def query_segment(self, x0, y0, x1, y1, radius):
+        length = math.hypot(x1 - x0, y1 - y0)
+        steps = max(1, math.ceil(2 * length / radius))  # Sample every half radius so the circles overlap
+        hit = set()
+        for i in range(steps + 1):
+            t = i / steps
+            hit.update(self.query(x0 + (x1 - x0) * t, y0 + (y1 - y0) * t, radius))
+        return sorted(hit)
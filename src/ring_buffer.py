@@ -0,0 +1,90 @@
+# Fixed-capacity time-series storage for the dashboards.
+# Every value is written twice (at i and i + capacity), so the most recent
+# n samples are always one contiguous slice and windows can be returned as
+# NumPy views without copying. Memory stays at 2 * capacity items forever.
+import numpy as np
+
+HISTORY_SECONDS = 24 * 60 * 60  # Default history: 24 h at 1 Hz
+
+
+class RingBuffer:
+    def __init__(self, capacity, dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = int(capacity)
+        self._data = np.zeros(2 * self.capacity, dtype=dtype)
+        self._head = 0   # Next write position in [0, capacity)
+        self.total = 0   # Number of values ever appended
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    # O(1) append, overwriting the oldest value once the buffer is full
+    def append(self, value):
+        head = self._head
+        self._data[head] = value
+        self._data[head + self.capacity] = value
+        self._head = head + 1 if head + 1 < self.capacity else 0
+        self.total += 1
+
+    # Append many values at once
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        if values.size > self.capacity:
+            self.total += values.size - self.capacity
+            values = values[-self.capacity:]
+        n = values.size
+        first = min(n, self.capacity - self._head)
+        for offset in (0, self.capacity):
+            self._data[self._head + offset:self._head + offset + first] = values[:first]
+            self._data[offset:offset + n - first] = values[first:]
+        self._head = (self._head + n) % self.capacity
+        self.total += n
+
+    # Read-only view of the last n values (all stored values if n is None), oldest first
+    def window(self, n=None):
+        size = len(self)
+        n = size if n is None else max(min(int(n), size), 0)
+        end = self._head + self.capacity
+        view = self._data[end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def last(self):
+        if self.total == 0:
+            raise IndexError("last() on empty RingBuffer")
+        return self._data[self._head + self.capacity - 1]
+
+    def clear(self):
+        self._head = 0
+        self.total = 0
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+
+# Paired time / value ring buffers for one chart series
+class TimeSeries:
+    def __init__(self, capacity=HISTORY_SECONDS, dtype=np.float64):
+        self.times = RingBuffer(capacity, np.float64)
+        self.values = RingBuffer(capacity, dtype)
+
+    def __len__(self):
+        return len(self.values)
+
+    def append(self, t, value):
+        self.times.append(t)
+        self.values.append(value)
+
+    def extend(self, times, values):
+        self.times.extend(times)
+        self.values.extend(values)
+
+    # Zero-copy (times, values) views of the last n samples
+    def window(self, n=None):
+        return self.times.window(n), self.values.window(n)
+
+    @property
+    def nbytes(self):
+        return self.times.nbytes + self.values.nbytes
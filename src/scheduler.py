@@ -0,0 +1,111 @@
+# Single tick scheduler for the Tk dashboards.
+# All periodic and one-shot work is kept in one priority queue and driven by
+# a single root.after timer. Periodic tasks are aligned to a shared grid on
+# the monotonic clock, so tasks with the same period fire in the same
+# callback and do not drift when a tick runs late.
+import heapq
+import itertools
+import math
+import sys
+import time
+
+
+class _Task:
+    __slots__ = ("key", "callback", "period", "due", "cancelled")
+
+    def __init__(self, key, callback, period, due):
+        self.key = key
+        self.callback = callback
+        self.period = period  # None for one-shot tasks
+        self.due = due
+        self.cancelled = False
+
+
+class TickScheduler:
+    def __init__(self, root, clock=time.monotonic):
+        self.root = root
+        self.clock = clock
+        self.epoch = clock()   # Periodic tasks are aligned to epoch + k * period
+        self._queue = []       # Heap of (due, seq, task)
+        self._tasks = {}       # key -> live task, at most one per key
+        self._seq = itertools.count()
+        self._after_id = None
+        self._armed_for = math.inf
+        self.late_ticks = 0    # Ticks that fired more than one period late and were skipped
+
+    # Run callback every period seconds under key, replacing any loop already
+    # registered with that key. With run_now the first call happens immediately.
+    def every(self, key, period, callback, run_now=True):
+        self.cancel(key)
+        now = self.clock()
+        task = _Task(key, callback, period, self._next_slot(now, period))
+        self._push(task)
+        if run_now:
+            callback()
+
+    # Run callback once after delay seconds, replacing a pending task with the same key
+    def after(self, key, delay, callback):
+        self.cancel(key)
+        self._push(_Task(key, callback, None, self.clock() + delay))
+
+    def cancel(self, key):
+        task = self._tasks.pop(key, None)
+        if task is not None:
+            task.cancelled = True  # Lazily dropped when it reaches the top of the heap
+
+    def is_active(self, key):
+        return key in self._tasks
+
+    def _next_slot(self, now, period):
+        ticks = math.floor((now - self.epoch) / period) + 1
+        return self.epoch + ticks * period
+
+    def _push(self, task):
+        self._tasks[task.key] = task
+        heapq.heappush(self._queue, (task.due, next(self._seq), task))
+        if task.due < self._armed_for:
+            self._arm()
+
+    # Keep exactly one Tk timer pending, for the earliest due task
+    def _arm(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        while self._queue and self._queue[0][2].cancelled:
+            heapq.heappop(self._queue)
+        if not self._queue:
+            self._armed_for = math.inf
+            return
+        due = self._queue[0][0]
+        delay_ms = max(0, math.ceil((due - self.clock()) * 1000))
+        self._armed_for = due
+        self._after_id = self.root.after(delay_ms, self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        self._armed_for = math.inf
+        now = self.clock()
+        due_tasks = []
+        while self._queue and self._queue[0][0] <= now:
+            task = heapq.heappop(self._queue)[2]
+            if not task.cancelled:
+                due_tasks.append(task)
+        for task in due_tasks:
+            if task.cancelled:
+                continue  # Cancelled by an earlier callback in this tick
+            if task.period is None:
+                self._tasks.pop(task.key, None)
+            else:
+                # Reschedule against the grid rather than now, skipping missed slots
+                next_due = task.due + task.period
+                if next_due <= now:
+                    self.late_ticks += 1
+                    next_due = self._next_slot(now, task.period)
+                task.due = next_due
+                heapq.heappush(self._queue, (task.due, next(self._seq), task))
+            try:
+                task.callback()
+            except Exception:
+                # Report like Tk does for after callbacks; the other tasks keep running
+                self.root.report_callback_exception(*sys.exc_info())
+        self._arm()
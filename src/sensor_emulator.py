@@ -0,0 +1,176 @@
+# Local stand-in for the greenhouse sensors.
+# Opens thousands of sensor streams against a sensor_ingest endpoint and
+# either synthesizes readings (resting plants with the odd folded one, as in
+# plant_engine) or replays a recorded file of reading lines at its original
+# pace. Readings for a whole tick are generated as arrays and encoded once;
+# in the binary format (the default) each stream is then sent a slice of
+# that one buffer, so the emulator can drive the ingestion service at full
+# rate.
+#
+#   python sensor_ingest.py tcp::9000 --sensors 100000 &
+#   python sensor_emulator.py --target tcp:127.0.0.1:9000 --streams 1000 --rate 100000
+import argparse
+import asyncio
+import sys
+import time
+import numpy as np
+from plant_engine import BASELINE_ENERGY, SPIKE_ENERGY, ENERGY_PER_PLANT
+from sensor_ingest import format_lines, parse_lines, parse_endpoint, records_batch, FLAG_CLOSED
+from sensor_format import MAGIC, RECORD_SIZE, encode_records, decode_records
+
+TICK = 0.1                # Seconds between sends
+CLOSED_PROBABILITY = 0.01  # Chance a synthetic reading comes from a folded plant
+UDP_PAYLOAD = 60000       # Bytes per datagram, cut at line or record ends
+
+
+# Readings for one tick from n_sensors sensors, read round robin
+class SyntheticReadings:
+    def __init__(self, sensors, seed=None):
+        self.sensors = sensors
+        self.cursor = 0
+        self.rng = np.random.default_rng(seed)
+
+    def next(self, n, now):
+        sensor = (self.cursor + np.arange(n)) % self.sensors
+        self.cursor = (self.cursor + n) % self.sensors
+        closed = self.rng.random(n) < CLOSED_PROBABILITY
+        energy = np.where(closed, ENERGY_PER_PLANT / 600, self.rng.uniform(BASELINE_ENERGY, SPIKE_ENERGY, n))
+        return np.full(n, now), sensor, energy, np.where(closed, FLAG_CLOSED, 0)
+
+
+# Readings of a recorded file (text lines, or records after MAGIC) in time
+# order, sent as their time comes up
+class ReplayReadings:
+    def __init__(self, path, speed=1.0):
+        with open(path, "rb") as file:
+            data = file.read()
+        if data.startswith(MAGIC):
+            batch = records_batch(decode_records(memoryview(data)[len(MAGIC):]))
+        else:
+            batch = parse_lines(data)
+        order = np.argsort(batch.time, kind="stable")
+        self.columns = [column[order] for column in batch]
+        self.sensors = int(batch.sensor.max()) + 1 if len(batch) else 1
+        self.speed = speed
+        self.position = 0
+        self.first = self.columns[0][0] if len(batch) else 0.0
+        self.started = None
+
+    @property
+    def done(self):
+        return self.position >= self.columns[0].size
+
+    def next(self, n, now):
+        if self.started is None:
+            self.started = now
+        stop = int(np.searchsorted(self.columns[0], self.first + (now - self.started) * self.speed, side="right"))
+        start, self.position = self.position, max(stop, self.position)
+        return tuple(column[start:self.position] for column in self.columns)
+
+
+async def open_streams(target, streams, binary):
+    kind, address = parse_endpoint(target)
+    loop = asyncio.get_running_loop()
+    senders = []
+    for _ in range(streams if kind != "serial" else 1):
+        if kind == "tcp":
+            _, writer = await asyncio.open_connection(*address)
+            if binary:
+                writer.write(MAGIC)
+            senders.append(writer)
+        elif kind == "udp":
+            transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol, remote_addr=address)
+            senders.append(transport)
+        else:
+            senders.append(open(address, "ab", buffering=0))
+            if binary:
+                senders[-1].write(MAGIC)
+    return kind, senders
+
+
+def send(kind, sender, data, binary):
+    if kind != "udp":
+        sender.write(data)
+    elif binary:
+        step = (UDP_PAYLOAD - len(MAGIC)) // RECORD_SIZE * RECORD_SIZE
+        for i in range(0, len(data), step):
+            sender.sendto(MAGIC + data[i:i + step])
+    else:
+        while data:
+            cut = data.rfind(b"\n", 0, UDP_PAYLOAD) + 1 if len(data) > UDP_PAYLOAD else len(data)
+            sender.sendto(data[:cut])
+            data = data[cut:]
+
+
+async def run(source, target, streams, rate, duration, binary=True):
+    kind, senders = await open_streams(target, streams, binary)
+    streams = len(senders)
+    per_tick = max(1, int(round(rate * TICK)))
+    sent = 0
+    started = time.perf_counter()
+    next_tick = started
+    while time.perf_counter() - started < duration and not getattr(source, "done", False):
+        now = time.perf_counter()
+        times, sensor, energy, flags = source.next(per_tick, now - started)
+        # Each stream carries a contiguous block of sensor ids
+        stream = sensor * streams // source.sensors
+        order = np.argsort(stream, kind="stable")
+        bounds = np.searchsorted(stream[order], np.arange(streams + 1))
+        if binary:
+            payload = memoryview(encode_records(times[order], sensor[order], energy[order], flags[order]))
+        for i, sender in enumerate(senders):
+            start, stop = bounds[i], bounds[i + 1]
+            if start == stop:
+                continue
+            if binary:
+                send(kind, sender, payload[start * RECORD_SIZE:stop * RECORD_SIZE], binary)
+            else:
+                part = order[start:stop]
+                send(kind, sender, format_lines(times[part], sensor[part], energy[part], flags[part]), binary)
+        if kind == "tcp":
+            try:
+                await asyncio.gather(*(writer.drain() for writer in senders))  # Honour the receiver's backpressure
+            except ConnectionError:
+                break  # Receiver closed
+        sent += sensor.size
+        next_tick += TICK
+        await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+    elapsed = time.perf_counter() - started
+    for sender in senders:
+        sender.close()
+    return sent, elapsed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Emulate many sensor streams against a sensor_ingest endpoint.")
+    parser.add_argument("--target", default="tcp:127.0.0.1:9000",
+                        help="tcp:HOST:PORT, udp:HOST:PORT or serial:PATH (default: %(default)s)")
+    parser.add_argument("--streams", type=int, default=1000, help="sensor streams (connections) (default: 1000)")
+    parser.add_argument("--sensors", type=int, default=100000, help="sensor ids to cycle through (default: 100000)")
+    parser.add_argument("--rate", type=float, default=100000, help="readings per second (default: 100000)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run (default: 10)")
+    parser.add_argument("--format", choices=("binary", "text"), default="binary",
+                        help="wire format of the readings (default: binary)")
+    parser.add_argument("--replay", help="replay reading lines from this file instead of synthesizing")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier (default: 1)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible runs")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.replay:
+        source = ReplayReadings(args.replay, args.speed)
+    else:
+        source = SyntheticReadings(args.sensors, args.seed)
+    sent, elapsed = asyncio.run(run(source, args.target, args.streams, args.rate, args.duration,
+                                         args.format == "binary"))
+    print(f"{'streams':>20}: {args.streams}")
+    print(f"{'readings':>20}: {sent}")
+    print(f"{'seconds':>20}: {elapsed:.3f}")
+    print(f"{'readings_per_s':>20}: {sent / max(elapsed, 1e-9):.6g}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,370 @@
+# Sensor ingestion service.
+# Replaces the get_sensor_data() placeholder with readings from real (or
+# emulated) sensors. Endpoints are TCP servers, UDP sockets or serial lines,
+# all served by one asyncio loop on a background thread. Readings arrive as
+# fixed-width binary records (sensor_format, streams and datagrams starting
+# with sensor_format.MAGIC) or as text lines
+#
+#     time,sensor,energy,flags\n
+#
+# (seconds, sensor id = plant index in the engine, µW, flag bits). Records
+# are viewed in place as NumPy arrays and text is parsed a whole chunk at a
+# time, so a ReadingBatch never holds one Python object per reading.
+# Batches go through a bounded queue: when the consumer falls behind, stream
+# readers stop reading, so TCP and serial senders are throttled by flow
+# control; UDP cannot be throttled and its batches are dropped and counted
+# instead.
+#
+# The consumer merges whatever batches are queued and applies them to a
+# SensorFeed, which keeps the latest reading of every sensor and offers the
+# same energy(start, stop) call as plant_engine.PlantArray, so the
+# simulation worker (and through it the dashboards and the battery) can read
+# sensors in place of the simulated plants.
+import asyncio
+import os
+import socket
+import threading
+import time
+from typing import NamedTuple
+import numpy as np
+from sensor_format import MAGIC, RECORD_SIZE, decode_records
+
+QUEUE_BATCHES = 64       # Parsed batches held before readers stop reading
+START_TIMEOUT = 5        # Seconds start() waits for the endpoints to open
+READ_SIZE = 1 << 16      # Bytes per read from a stream
+MAX_MERGE = 256          # Batches merged into one feed update
+UDP_BUFFER = 1 << 23     # Bytes of socket buffer asked for UDP bursts (capped by the OS)
+FIELDS = 4               # time, sensor, energy, flags
+FLAG_CLOSED = 1          # Leaves were folded when the reading was taken
+
+
+class ReadingBatch(NamedTuple):
+    time: np.ndarray    # float64 seconds
+    sensor: np.ndarray  # int64 sensor id
+    energy: np.ndarray  # float64 µW
+    flags: np.ndarray   # int64 flag bits
+
+    def __len__(self):
+        return self.sensor.size
+
+
+def empty_batch():
+    return ReadingBatch(np.empty(0), np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=np.int64))
+
+
+# Batch of field views over decoded binary records (no copy)
+def records_batch(records):
+    return ReadingBatch(records["time"], records["sensor"], records["energy"], records["flags"])
+
+
+def merge_batches(batches):
+    if len(batches) == 1:
+        return batches[0]
+    return ReadingBatch(*(np.concatenate(column) for column in zip(*batches)))
+
+
+# Text for a batch of readings, one line each
+def format_lines(times, sensors, energy, flags):
+    n = len(sensors)
+    if n == 0:
+        return b""
+    values = np.empty((n, FIELDS), dtype=object)
+    values[:, 0], values[:, 1], values[:, 2], values[:, 3] = times, sensors, energy, flags
+    return (("%.3f,%d,%.4f,%d\n" * n) % tuple(values.ravel().tolist())).encode()
+
+
+# Parse complete lines into a batch. The fast path hands the whole buffer to
+# NumPy's C parser once every line has exactly FIELDS fields (so no field can
+# shift into another row); buffers with malformed lines are parsed line by
+# line and the bad lines skipped.
+def parse_lines(data):
+    raw = np.frombuffer(data, dtype=np.uint8)
+    ends = np.flatnonzero(raw == ord("\n"))
+    if ends.size == 0:
+        return empty_batch()
+    commas = np.searchsorted(np.flatnonzero(raw == ord(",")), ends)  # Commas before each line end
+    values = None
+    if raw[-1] == ord("\n") and (np.diff(commas, prepend=0) == FIELDS - 1).all():
+        try:
+            values = np.fromstring(data.replace(b"\n", b","), sep=",")
+        except ValueError:
+            pass  # Stopped at a malformed field
+    if values is None or values.size != ends.size * FIELDS:
+        rows = []
+        for line in data.splitlines():
+            try:
+                row = [float(field) for field in line.split(b",")]
+            except ValueError:
+                continue
+            if len(row) == FIELDS:
+                rows.append(row)
+        values = np.array(rows, dtype=np.float64).reshape(-1, FIELDS)
+    values = values.reshape(-1, FIELDS)
+    return ReadingBatch(values[:, 0].copy(), values[:, 1].astype(np.int64), values[:, 2].copy(),
+                        values[:, 3].astype(np.int64))
+
+
+# Latest reading of every sensor
+class SensorFeed:
+    def __init__(self, sensors):
+        self.count = sensors
+        self.readings = np.zeros(sensors)                   # µW
+        self.flags = np.zeros(sensors, dtype=np.int64)
+        self.updated = np.full(sensors, -np.inf)            # Time of the latest reading
+        self.received = 0      # Readings applied
+        self.rejected = 0      # Readings for unknown sensor ids
+        self.listeners = []    # Called with every applied batch
+
+    def subscribe(self, callback):
+        self.listeners.append(callback)
+
+    def apply(self, batch):
+        known = (batch.sensor >= 0) & (batch.sensor < self.count)
+        if not known.all():
+            self.rejected += int(np.count_nonzero(~known))
+            batch = ReadingBatch(*(column[known] for column in batch))
+        # With repeated ids in a batch the last (latest) reading wins
+        self.readings[batch.sensor] = batch.energy
+        self.flags[batch.sensor] = batch.flags
+        self.updated[batch.sensor] = batch.time
+        self.received += len(batch)
+        for callback in self.listeners:
+            callback(batch)
+
+    # Summed latest readings of sensors [start, stop) in µW, as PlantArray.energy
+    def energy(self, start=0, stop=None):
+        return float(self.readings[start:stop].sum())
+
+    def is_closed(self, start=0, stop=None):
+        return bool((self.flags[start:stop] & FLAG_CLOSED).any())
+
+
+# "tcp:HOST:PORT", "udp:HOST:PORT" or "serial:PATH" -> (kind, address)
+def parse_endpoint(text):
+    kind, _, address = text.partition(":")
+    if kind in ("tcp", "udp"):
+        host, _, port = address.rpartition(":")
+        return kind, (host or "0.0.0.0", int(port))
+    if kind == "serial":
+        return kind, address
+    raise ValueError(f"unknown endpoint {text!r}, expected tcp:HOST:PORT, udp:HOST:PORT or serial:PATH")
+
+
+class _DatagramReceiver(asyncio.DatagramProtocol):
+    def __init__(self, ingest):
+        self.ingest = ingest
+
+    def datagram_received(self, data, addr):
+        if data.startswith(MAGIC):
+            self.ingest.offer(records_batch(decode_records(memoryview(data)[len(MAGIC):])))
+        else:
+            self.ingest.offer(parse_lines(data))
+
+
+class SensorIngest:
+    def __init__(self, feed, queue_batches=QUEUE_BATCHES):
+        self.feed = feed
+        self.queue_batches = queue_batches
+        self.queue = None
+        self.loop = None
+        self.ready = threading.Event()  # Set once every endpoint is listening
+        self.batches = 0       # Batches parsed
+        self.dropped = 0       # Readings dropped because the queue was full (UDP only)
+        self.connections = 0   # Open stream connections
+        self.started = None
+        self.error = None      # Why the endpoints failed to open (port in use, missing serial path, ...)
+        self._closers = []
+        self._thread = None
+        self._task = None
+
+    # Readings applied per second since start
+    @property
+    def rate(self):
+        if self.started is None:
+            return 0.0
+        return self.feed.received / max(time.perf_counter() - self.started, 1e-9)
+
+    # Queue a batch without waiting; counts it as dropped when the queue is full
+    def offer(self, batch):
+        if len(batch) == 0:
+            return
+        try:
+            self.queue.put_nowait(batch)
+            self.batches += 1
+        except asyncio.QueueFull:
+            self.dropped += len(batch)
+
+    # Queue a batch, waiting for room (the backpressure point for TCP and serial)
+    async def put(self, batch):
+        if len(batch):
+            await self.queue.put(batch)
+            self.batches += 1
+
+    # Read a byte stream in whichever format it opens with
+    async def read_stream(self, reader):
+        try:
+            head = await reader.readexactly(len(MAGIC))
+        except asyncio.IncompleteReadError as error:
+            head = error.partial
+        if head == MAGIC:
+            await self._read_records(reader)
+        else:
+            await self._read_lines(reader, head)
+
+    # Whole records of each chunk are viewed in place. A record split across
+    # reads is completed from the head of the next chunk and queued as its own
+    # one-record batch, so only its bytes are ever copied.
+    async def _read_records(self, reader):
+        pending = b""
+        while True:
+            chunk = await reader.read(READ_SIZE)
+            if not chunk:
+                break
+            view = memoryview(chunk)
+            if pending:
+                head = RECORD_SIZE - len(pending)
+                if len(view) < head:
+                    pending += chunk
+                    continue
+                await self.put(records_batch(decode_records(pending + chunk[:head])))
+                view = view[head:]
+            cut = len(view) - len(view) % RECORD_SIZE
+            if cut:
+                await self.put(records_batch(decode_records(view[:cut])))
+            pending = bytes(view[cut:])
+
+    async def _read_lines(self, reader, pending=b""):
+        while True:
+            chunk = await reader.read(READ_SIZE)
+            if not chunk:
+                break
+            pending += chunk
+            cut = pending.rfind(b"\n") + 1
+            if cut:
+                await self.put(parse_lines(pending[:cut]))
+                pending = pending[cut:]
+        if pending.strip():
+            await self.put(parse_lines(pending + b"\n"))  # Last line without a newline
+
+    async def _client(self, reader, writer):
+        self.connections += 1
+        try:
+            await self.read_stream(reader)
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # Sender went away or the service is stopping
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def serve_tcp(self, host, port):
+        server = await asyncio.start_server(self._client, host, port, limit=READ_SIZE)
+        self._closers.append(server.close)
+        return server
+
+    async def serve_udp(self, host, port):
+        transport, _ = await self.loop.create_datagram_endpoint(lambda: _DatagramReceiver(self),
+                                                                local_addr=(host, port))
+        # Datagrams that overflow the socket buffer are lost before we see them
+        transport.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_BUFFER)
+        self._closers.append(transport.close)
+        return transport
+
+    # Serial line as a tty or pipe path; set the baud rate beforehand (stty)
+    async def read_serial(self, path):
+        reader = asyncio.StreamReader(limit=READ_SIZE)
+        pipe = os.fdopen(os.open(path, os.O_RDONLY | os.O_NONBLOCK | getattr(os, "O_NOCTTY", 0)), "rb", 0)
+        transport, _ = await self.loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+        self._closers.append(transport.close)
+        return asyncio.ensure_future(self.read_stream(reader))
+
+    # Apply queued batches to the feed, merging whatever is waiting
+    async def consume(self):
+        while True:
+            batches = [await self.queue.get()]
+            while len(batches) < MAX_MERGE and not self.queue.empty():
+                batches.append(self.queue.get_nowait())
+            self.feed.apply(merge_batches(batches))
+
+    async def run(self, endpoints):
+        self.loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        self.queue = asyncio.Queue(self.queue_batches)
+        openers = {"tcp": lambda a: self.serve_tcp(*a), "udp": lambda a: self.serve_udp(*a),
+                   "serial": self.read_serial}
+        try:
+            try:
+                for endpoint in endpoints:
+                    kind, address = parse_endpoint(endpoint)
+                    await openers[kind](address)
+            except (OSError, ValueError) as error:
+                self.error = error  # Re-raised by start()
+                return
+            self.started = time.perf_counter()
+            self.ready.set()
+            await self.consume()
+        except asyncio.CancelledError:
+            pass  # stop()
+        finally:
+            for close in self._closers:
+                close()
+
+    # Run the service on a daemon thread; returns once the endpoints are open
+    # and raises if any of them could not be opened
+    def start(self, endpoints, timeout=START_TIMEOUT):
+        endpoints = list(endpoints)
+        for endpoint in endpoints:
+            parse_endpoint(endpoint)  # Malformed endpoints raise here rather than on the thread
+        self._thread = threading.Thread(target=asyncio.run, args=(self.run(endpoints),),
+                                        name="sensor-ingest", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.ready.wait(0.05) and self._thread.is_alive() and time.monotonic() < deadline:
+            pass
+        if self.ready.is_set():
+            return
+        if self.error is not None:
+            raise self.error
+        if not self._thread.is_alive():
+            raise RuntimeError("sensor ingest thread exited before its endpoints opened")
+        self.stop()
+        raise TimeoutError(f"sensor endpoints did not open within {timeout} s")
+
+    def stop(self):
+        if self._task is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the sensor ingestion service and report its throughput.")
+    parser.add_argument("endpoints", nargs="+", help="tcp:HOST:PORT, udp:HOST:PORT or serial:PATH")
+    parser.add_argument("--sensors", type=int, default=100000, help="sensor ids accepted (default: 100000)")
+    parser.add_argument("--duration", type=float, default=None, help="seconds to run (default: until Ctrl+C)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    feed = SensorFeed(args.sensors)
+    ingest = SensorIngest(feed)
+    ingest.start(args.endpoints)
+    started = time.perf_counter()
+    last = 0
+    try:
+        while args.duration is None or time.perf_counter() - started < args.duration:
+            time.sleep(1)
+            print(f"{feed.received - last:>9} readings/s  {ingest.connections:>5} connections  "
+                  f"{ingest.dropped:>7} dropped  {feed.rejected:>7} rejected", flush=True)
+            last = feed.received
+    except KeyboardInterrupt:
+        pass
+    ingest.stop()
+    print(f"{feed.received} readings, {ingest.rate:.6g} readings/s on average")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
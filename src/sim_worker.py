@@ -0,0 +1,148 @@
+# Background simulation worker for the dashboards.
+# The plant engine, energy accounting and battery / flywheel integration run
+# on their own thread at a fixed time step. Results are published as
+# immutable snapshots: the worker swaps in a new snapshot by a single
+# reference assignment and the Tk side only ever reads the latest one, so a
+# slow chart draw can drop frames without losing any energy.
+import queue
+import threading
+import time
+from typing import NamedTuple
+import numpy as np
+
+
+class Snapshot(NamedTuple):
+    seq: int               # Increments with every published snapshot
+    time: float            # Simulated seconds since the worker started
+    energy: dict           # Group name -> total energy reading in µW
+    battery_level: float   # Stored energy in J
+    battery_fraction: float  # Stored energy as a fraction of capacity
+    flywheel_speed: float  # RPM
+    greenhouse: object = None  # greenhouse.GreenhouseReading, if the worker has a greenhouse
+
+
+class SimulationWorker(threading.Thread):
+    def __init__(self, engine, groups, charge_group, battery, flywheel=None, load_power=0.0,
+                 efficiency=1.0, stimulation_power=0.0, max_flywheel_rpm=6000, dt=0.1, sections=None,
+                 stimulator=None, chain=None, source=None):
+        super().__init__(name="simulation-worker", daemon=True)
+        self.engine = engine                  # Only touched from the worker thread once started
+        self.groups = dict(groups)            # Group name -> (start, stop) plant slice
+        self.charge_group = charge_group      # Group whose energy charges the battery
+        self.battery = battery                # battery.Battery, energy in J
+        self.flywheel = flywheel              # Optional flywheel.FlywheelBank boosted from the battery
+        self.load_power = load_power          # Constant draw on the battery in W
+        self.efficiency = efficiency          # Fraction of plant energy that reaches the battery
+        self.stimulation_power = stimulation_power  # Vibrator draw per charging plant in W
+        self.max_flywheel_rpm = max_flywheel_rpm
+        self.sections = sections              # Optional greenhouse.SectionTotals sampled into each snapshot
+        self.stimulator = stimulator          # Optional stimulation.StimulationScheduler firing vibrators
+        self.chain = chain                    # Optional conversion.ConversionChain, replaces efficiency
+        # Energy readings come from the engine, or from e.g. a sensor_ingest.SensorFeed
+        # with the same energy(start, stop) call; the engine still tracks touches
+        self.source = engine if source is None else source
+        self.dt = dt
+        self.commands = queue.SimpleQueue()
+        self.steps = 0
+        self.harvested = 0.0  # J delivered by the charge group
+        self.boosted = 0.0    # J drawn from the battery to boost the flywheel
+        self.stimulated = 0.0  # J spent on stimulating the charge group
+        self._stop_event = threading.Event()
+        self.latest = self._snapshot()
+
+    # --- Tk side: enqueue commands, read snapshots ---
+
+    def touch(self, group):
+        self.commands.put(("touch", group))
+
+    # Touch an arbitrary plant range, e.g. one greenhouse section
+    def touch_range(self, start, stop):
+        self.commands.put(("touch_range", start, stop))
+
+    # Install (or with None remove) the automatic stimulation scheduler
+    def set_stimulator(self, stimulator):
+        self.commands.put(("stimulator", stimulator))
+
+    def resize_group(self, group, start, stop):
+        self.commands.put(("resize", group, start, stop))
+
+    def stop(self):
+        self._stop_event.set()
+
+    # --- Worker thread ---
+
+    def run(self):
+        next_step = time.monotonic()
+        while not self._stop_event.is_set():
+            self._apply_commands()
+            # Catch up on every step that is due, so accounting does not depend
+            # on how often the thread gets scheduled
+            now = time.monotonic()
+            while next_step <= now:
+                self.step()
+                next_step += self.dt
+            self.latest = self._snapshot()
+            self._stop_event.wait(max(next_step - time.monotonic(), 0))
+
+    def _apply_commands(self):
+        while True:
+            try:
+                command = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            if command[0] == "touch":
+                self.engine.touch(*self.groups[command[1]])
+            elif command[0] == "touch_range":
+                self.engine.touch(command[1], command[2])
+            elif command[0] == "stimulator":
+                self.stimulator = command[1]
+            elif command[0] == "resize":
+                _, group, start, stop = command
+                self.groups[group] = (start, stop)
+                needed = max(stop for _, stop in self.groups.values())
+                if needed > self.engine.count:
+                    self.engine.resize(needed)
+
+    # One fixed time step of the whole model. Also used directly by the
+    # headless simulate.py, which runs it without the thread as fast as possible.
+    def step(self):
+        start, stop = self.groups[self.charge_group]
+        vibrators = self._vibrator_power(start, stop)
+        self.engine.step(self.dt)
+        if self.chain is not None:
+            power = self.chain.step(self.source.energy(start, stop) * 1e-6, self.dt)  # µW -> W through the chain
+        else:
+            power = self.source.energy(start, stop) * 1e-6 * self.efficiency  # µW -> W after conversion
+        stimulation = self.stimulation_power * (stop - start) + vibrators
+        boost = 0.0
+        if self.flywheel is not None:
+            # Periodic boosts keep the flywheel above its cut-out speed, paid for by the battery
+            request = np.minimum(self.flywheel.boost_request(), self.battery.level / self.dt)
+            boost = float(self.flywheel.step(request, self.dt).sum())
+        self.battery.step(power - self.load_power - stimulation - boost, self.dt)
+        self.harvested += power * self.dt
+        self.stimulated += stimulation * self.dt
+        self.boosted += boost * self.dt
+        self.steps += 1
+        return power
+
+    # Vibrator draw in W this step that the battery pays for: the pulses on
+    # plants inside the charge group. Pulses on other plants (e.g. the
+    # greenhouse) are counted by the stimulator but not billed here.
+    def _vibrator_power(self, start, stop):
+        if self.stimulator is None:
+            return 0.0
+        plants = self.stimulator.step()
+        billed = np.count_nonzero((plants >= start) & (plants < stop))
+        return self.stimulator.cost * billed / self.dt
+
+    def _snapshot(self):
+        energy = {name: self.source.energy(start, stop) for name, (start, stop) in self.groups.items()}
+        fraction = self.battery.fraction
+        if self.flywheel is not None:
+            flywheel_speed = float(self.flywheel.rpm[0])
+        else:
+            flywheel_speed = fraction * self.max_flywheel_rpm
+        greenhouse = self.sections.sample() if self.sections is not None else None
+        return Snapshot(self.steps, self.engine.time, energy, self.battery.level, fraction, flywheel_speed,
+                        greenhouse)
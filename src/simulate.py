@@ -0,0 +1,165 @@
+# Headless fast-forward simulation of the Mimosa energy model.
+# Runs the same plant engine, battery and flywheel step as the dashboard
+# (SimulationWorker.step) without Tk and without waiting for the wall clock,
+# then prints summary statistics and optionally writes a time series.
+#
+#   python simulate.py --plants 1000 --duration 24h --output day.csv
+import argparse
+import csv
+import sys
+import time
+import numpy as np
+from plant_engine import PlantArray, BASELINE_ENERGY, SPIKE_ENERGY, ENERGY_PER_PLANT
+from battery import Battery
+from flywheel import FlywheelBank
+from sim_worker import SimulationWorker
+from stimulation import StimulationScheduler
+from spike_model import SpikeKernel, RISE_TIME, DECAY_TIME
+from conversion import default_chain
+
+# Defaults mirror the dashboard setup in mimosafinal.py
+BATTERY_CAPACITY = 1.0     # J (MAX_BATTERY_CAPACITY = 1,000,000 µJ)
+BATTERY_START = 0.1        # Initial charge as a fraction of capacity
+FLYWHEEL_INERTIA = 2.5e-8  # kg m^2
+FLYWHEEL_MAX_POWER = 1e-3  # W
+TOUCHES_PER_HOUR = 6       # Stimulations per plant per hour (one every 10 minutes)
+EFFICIENCY = 1.0           # Conversion efficiency plant -> battery (the README estimates 0.45)
+STIMULATION_POWER = 0.0    # Vibrator draw per plant in W (the README estimates 0.1 µW)
+TIME_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+# "90", "90s", "15m", "24h", "7d" -> seconds
+def parse_duration(text):
+    text = text.strip().lower()
+    if text and text[-1] in TIME_UNITS:
+        return float(text[:-1]) * TIME_UNITS[text[-1]]
+    return float(text)
+
+
+def build_worker(plants, dt=1.0, battery_capacity=BATTERY_CAPACITY, battery_start=BATTERY_START,
+                 flywheel_inertia=FLYWHEEL_INERTIA, flywheel_power=FLYWHEEL_MAX_POWER,
+                 load_power=0.0, efficiency=EFFICIENCY, stimulation_power=STIMULATION_POWER,
+                 touch_energy=ENERGY_PER_PLANT / 600, auto_stimulate=False, kernel=None, chain=None, seed=None):
+    engine = PlantArray(plants, BASELINE_ENERGY, SPIKE_ENERGY, touch_energy, seed=seed, kernel=kernel)
+    battery = Battery(battery_capacity, level=battery_capacity * battery_start)
+    flywheel = None
+    if flywheel_inertia > 0:
+        flywheel = FlywheelBank(inertia=flywheel_inertia, max_charge_power=flywheel_power,
+                                max_discharge_power=flywheel_power)
+    stimulator = StimulationScheduler(engine, 0, plants, dt) if auto_stimulate else None
+    return SimulationWorker(engine, {"plants": (0, plants)}, "plants", battery, flywheel,
+                            load_power=load_power, efficiency=efficiency,
+                            stimulation_power=stimulation_power, dt=dt, stimulator=stimulator,
+                            chain=chain)
+
+
+# Step the worker for duration seconds. Touches arrive as a Poisson process.
+# Returns the summary dict and, if record_every > 0, arrays sampled every
+# record_every steps: (time, power W, battery J, flywheel RPM).
+def run_simulation(worker, duration, touches_per_hour=TOUCHES_PER_HOUR, record_every=0, seed=None):
+    rng = np.random.default_rng(seed)
+    engine, battery, flywheel = worker.engine, worker.battery, worker.flywheel
+    steps = int(round(duration / worker.dt))
+    touch_rate = touches_per_hour * engine.count * worker.dt / 3600  # Expected touches per step
+    touches = rng.poisson(touch_rate, steps) if touch_rate > 0 else np.zeros(steps, dtype=np.int64)
+    n_records = steps // record_every if record_every else 0
+    series = np.empty((n_records, 4))
+    battery_min, battery_max = battery.level, battery.level
+    power_peak = 0.0
+    started = time.perf_counter()
+    for i in range(steps):
+        if touches[i]:
+            engine.touch_indices(rng.integers(0, engine.count, touches[i]))
+        power = worker.step()
+        level = battery.level
+        if level < battery_min:
+            battery_min = level
+        elif level > battery_max:
+            battery_max = level
+        if power > power_peak:
+            power_peak = power
+        if record_every and (i + 1) % record_every == 0:
+            rpm = flywheel.rpm[0] if flywheel is not None else 0.0
+            series[(i + 1) // record_every - 1] = (engine.time, power, level, rpm)
+    elapsed = time.perf_counter() - started
+    simulated = steps * worker.dt
+    summary = {
+        "plants": engine.count,
+        "simulated_s": simulated,
+        "wall_s": elapsed,
+        "speedup": simulated / elapsed if elapsed else float("inf"),
+        "touches": int(touches.sum()),
+        "harvested_j": worker.harvested,
+        "mean_power_w": worker.harvested / simulated if simulated else 0.0,
+        "peak_power_w": power_peak,
+        "stimulation_j": worker.stimulated,
+        "net_j": worker.harvested - worker.stimulated,
+        "boost_j": worker.boosted,
+        "vibrator_pulses": worker.stimulator.fired if worker.stimulator is not None else 0,
+        "battery_final_pct": battery.fraction * 100,
+        "battery_min_pct": battery_min / battery.capacity * 100,
+        "battery_max_pct": battery_max / battery.capacity * 100,
+        "flywheel_final_rpm": float(flywheel.rpm[0]) if flywheel is not None else 0.0,
+    }
+    return summary, series
+
+
+def write_series(path, series):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["time_s", "power_w", "battery_j", "flywheel_rpm"])
+        writer.writerows(series.tolist())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Mimosa energy model headless and as fast as possible.")
+    parser.add_argument("--plants", type=int, default=100, help="number of plants (default: 100)")
+    parser.add_argument("--duration", type=parse_duration, default=parse_duration("24h"),
+                        help="simulated time, e.g. 3600, 90m, 24h, 7d (default: 24h)")
+    parser.add_argument("--dt", type=float, default=1.0, help="time step in seconds (default: 1)")
+    parser.add_argument("--touch-rate", type=float, default=TOUCHES_PER_HOUR,
+                        help="touches per plant per hour (default: %(default)s)")
+    parser.add_argument("--battery-capacity", type=float, default=BATTERY_CAPACITY, help="battery capacity in J")
+    parser.add_argument("--battery-start", type=float, default=BATTERY_START,
+                        help="initial battery charge as a fraction (default: %(default)s)")
+    parser.add_argument("--flywheel-inertia", type=float, default=FLYWHEEL_INERTIA,
+                        help="flywheel moment of inertia in kg m^2, 0 disables the flywheel")
+    parser.add_argument("--flywheel-power", type=float, default=FLYWHEEL_MAX_POWER, help="flywheel power rating in W")
+    parser.add_argument("--load", type=float, default=0.0, help="constant load on the battery in W")
+    parser.add_argument("--efficiency", type=float, default=EFFICIENCY,
+                        help="conversion efficiency from plants to battery (default: %(default)s)")
+    parser.add_argument("--chain", action="store_true",
+                        help="convert through the piezo/capacitor/rectifier/dynamo chain instead of --efficiency")
+    parser.add_argument("--stimulation-power", type=float, default=STIMULATION_POWER,
+                        help="vibrator power per plant in W (default: %(default)s)")
+    parser.add_argument("--auto-stimulate", action="store_true",
+                        help="fire section vibrators automatically at the net-optimal interval")
+    parser.add_argument("--spike-kernel", nargs=2, type=float, metavar=("RISE", "DECAY"),
+                        help="event-driven readings: baseline plus spikes with these rise and decay "
+                             f"time constants in s (e.g. {RISE_TIME} {DECAY_TIME}) instead of random draws")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible runs")
+    parser.add_argument("--output", help="write a time series CSV to this path")
+    parser.add_argument("--record-every", type=int, default=60, help="steps between time series rows (default: 60)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    engine_seed, touch_seed = np.random.SeedSequence(args.seed).spawn(2)  # Independent streams
+    kernel = SpikeKernel(*args.spike_kernel) if args.spike_kernel else None
+    worker = build_worker(args.plants, args.dt, args.battery_capacity, args.battery_start,
+                          args.flywheel_inertia, args.flywheel_power, args.load, args.efficiency,
+                          args.stimulation_power, auto_stimulate=args.auto_stimulate, kernel=kernel,
+                          chain=default_chain() if args.chain else None, seed=engine_seed)
+    record_every = args.record_every if args.output else 0
+    summary, series = run_simulation(worker, args.duration, args.touch_rate, record_every, touch_seed)
+    for key, value in summary.items():
+        print(f"{key:>20}: {value:.6g}" if isinstance(value, float) else f"{key:>20}: {value}")
+    if args.output:
+        write_series(args.output, series)
+        print(f"{'time_series':>20}: {args.output} ({len(series)} rows)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
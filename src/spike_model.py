@@ -0,0 +1,156 @@
+# Event-driven spike model for plant readings.
+# A touch is an event (time, plant range, amplitude) whose reading follows a
+# rise-and-decay kernel
+#
+#   k(t) = (exp(-t / decay) - exp(-t / rise)) / norm,  t >= 0
+#
+# normalised so its maximum is 1. The aggregate signal is the superposition
+# of the kernels of all events, so cost grows with the number of events and
+# not with plants x ticks: idle plants cost nothing, and events older than
+# the kernel horizon are dropped.
+import numpy as np
+
+RISE_TIME = 0.3    # Seconds, time constant of the leaf-fold rise
+DECAY_TIME = 3.0   # Seconds, time constant of the return to baseline
+HORIZON = 1e-4     # Events are dropped once their kernel falls below this fraction of the peak
+EXP_SPAN = 300.0   # Largest exponent used when factoring exponentials (exp(300) fits in a double)
+
+
+class SpikeKernel:
+    def __init__(self, rise=RISE_TIME, decay=DECAY_TIME):
+        if not 0 < rise < decay:
+            raise ValueError("need 0 < rise < decay")
+        self.rise = rise
+        self.decay = decay
+        t_peak = rise * decay / (decay - rise) * np.log(decay / rise)
+        self.norm = np.exp(-t_peak / decay) - np.exp(-t_peak / rise)
+        self.t_peak = t_peak
+        self.horizon = t_peak - decay * np.log(HORIZON)  # Past this the decay term is below HORIZON
+
+    # Kernel value at times t since the event (0 before the event)
+    def __call__(self, t):
+        t = np.asarray(t, dtype=np.float64)
+        clipped = np.maximum(t, 0)
+        value = (np.exp(-clipped / self.decay) - np.exp(-clipped / self.rise)) / self.norm
+        return np.where(t >= 0, value, 0.0)
+
+    # Energy under one unit spike in µW·s
+    @property
+    def area(self):
+        return (self.decay - self.rise) / self.norm
+
+    # Aggregate signal at each of times from events with the given times and
+    # amplitudes. Each exponential term is a running sum over the sorted
+    # events, evaluated in O(events + times) with no per-plant work.
+    def superpose(self, event_times, amplitudes, times):
+        event_times = np.asarray(event_times, dtype=np.float64)
+        amplitudes = np.broadcast_to(np.asarray(amplitudes, dtype=np.float64), event_times.shape)
+        order = np.argsort(event_times, kind="stable")
+        event_times, amplitudes = event_times[order], amplitudes[order]
+        times = np.asarray(times, dtype=np.float64)
+        last = np.searchsorted(event_times, times, side="right") - 1  # Latest event at or before each time
+        result = np.zeros(times.shape)
+        if event_times.size == 0:
+            return result
+        for tau, sign in ((self.decay, 1.0), (self.rise, -1.0)):
+            running = _running_decay(event_times, amplitudes, tau)
+            since = times - event_times[np.maximum(last, 0)]
+            result += sign * np.where(last >= 0, running[np.maximum(last, 0)] * np.exp(-since / tau), 0.0)
+        return result / self.norm
+
+
+# S_k = sum over i <= k of A_i * exp(-(t_k - t_i) / tau) for sorted event
+# times, computed with cumulative sums in blocks short enough that the
+# factored exponentials cannot overflow
+def _running_decay(event_times, amplitudes, tau):
+    running = np.empty(event_times.size)
+    carry, carry_time = 0.0, event_times[0]
+    start = 0
+    while start < event_times.size:
+        t0 = event_times[start]
+        stop = int(np.searchsorted(event_times, t0 + EXP_SPAN * tau, side="right"))
+        offsets = (event_times[start:stop] - t0) / tau
+        block = np.cumsum(amplitudes[start:stop] * np.exp(offsets)) * np.exp(-offsets)
+        block += carry * np.exp(-(event_times[start:stop] - carry_time) / tau)
+        running[start:stop] = block
+        carry, carry_time = block[-1], event_times[stop - 1]
+        start = stop
+    return running
+
+
+# Live events for the plant engine: each covers the plants [start, stop)
+# with a per-plant amplitude. Range queries cost O(live events).
+class SpikeEvents:
+    def __init__(self, kernel=None, capacity=1024):
+        self.kernel = kernel or SpikeKernel()
+        self.time = np.zeros(capacity)
+        self.start = np.zeros(capacity, dtype=np.int64)
+        self.stop = np.zeros(capacity, dtype=np.int64)
+        self.amplitude = np.zeros(capacity)
+        self.count = 0
+        self.total = 0  # Events ever added
+
+    def __len__(self):
+        return self.count
+
+    def add(self, time, start, stop, amplitude):
+        start, stop, amplitude = np.broadcast_arrays(np.atleast_1d(start), stop, amplitude)
+        n = start.size
+        if self.count + n > self.time.size:
+            capacity = max(self.count + n, 2 * self.time.size)
+            for name in ("time", "start", "stop", "amplitude"):
+                array = getattr(self, name)
+                grown = np.zeros(capacity, dtype=array.dtype)
+                grown[:self.count] = array[:self.count]
+                setattr(self, name, grown)
+        end = self.count + n
+        self.time[self.count:end] = time
+        self.start[self.count:end] = start
+        self.stop[self.count:end] = stop
+        self.amplitude[self.count:end] = amplitude
+        self.count = end
+        self.total += n
+
+    # Drop events whose kernel has decayed past the horizon. Events are added
+    # in time order, so the expired ones are a prefix.
+    def prune(self, now):
+        expired = int(np.searchsorted(self.time[:self.count], now - self.kernel.horizon, side="right"))
+        if expired:
+            keep = self.count - expired
+            for array in (self.time, self.start, self.stop, self.amplitude):
+                array[:keep] = array[expired:self.count]
+            self.count = keep
+
+    # Summed spike reading of the plants in [start, stop) at time now in µW
+    def energy(self, now, start=0, stop=None):
+        n = self.count
+        if n == 0:
+            return 0.0
+        first, last = self.start[:n], self.stop[:n]
+        if stop is None:
+            overlap = last - np.maximum(first, start)
+        else:
+            overlap = np.minimum(last, stop) - np.maximum(first, start)
+        weights = np.maximum(overlap, 0) * self.amplitude[:n]
+        return float(np.dot(weights, self.kernel(now - self.time[:n])))
+
+    # Summed spike reading of the plants in each bin [edges[i], edges[i + 1])
+    # at time now. Coverage of an event is piecewise linear in the plant
+    # index, so the cumulative reading at every edge comes from two sorted
+    # prefix sums: O((events + bins) log events), independent of the plants.
+    def energy_bins(self, now, edges):
+        edges = np.asarray(edges, dtype=np.float64)
+        n = self.count
+        if n == 0:
+            return np.zeros(max(edges.size - 1, 0))
+        weights = self.amplitude[:n] * self.kernel(now - self.time[:n])
+        # Reading of the plants below x: sum of w * (relu(x - start) - relu(x - stop))
+        cumulative = np.zeros(edges.size)
+        for bounds, sign in ((self.start[:n], 1.0), (self.stop[:n], -1.0)):
+            order = np.argsort(bounds, kind="stable")
+            bounds, w = bounds[order].astype(np.float64), weights[order]
+            below = np.searchsorted(bounds, edges)
+            total_w = np.r_[0.0, np.cumsum(w)][below]
+            total_wx = np.r_[0.0, np.cumsum(w * bounds)][below]
+            cumulative += sign * (edges * total_w - total_wx)
+        return np.diff(cumulative)
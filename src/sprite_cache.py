@@ -0,0 +1,40 @@
+# Pre-rendered surface caches for the pygame simulation.
+# Text, plant sprites and button faces are rendered once and then only
+# blitted, instead of calling font.render / pygame.draw every frame.
+from collections import OrderedDict
+import pygame
+
+
+# Least-recently-used cache of rendered text surfaces, keyed by (text, colour)
+class TextCache:
+    def __init__(self, font, max_entries=256):
+        self.font = font
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+
+    def render(self, text, color):
+        key = (text, color)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            surface = self.font.render(text, True, color)
+            self._surfaces[key] = surface
+            if len(self._surfaces) > self.max_entries:
+                self._surfaces.popitem(last=False)
+        else:
+            self._surfaces.move_to_end(key)
+        return surface
+
+
+# Filled circle on a transparent surface, blitted with its top-left at (x - r, y - r)
+def circle_sprite(radius, color):
+    surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(surface, color, (radius, radius), radius)
+    return surface.convert_alpha() if pygame.display.get_surface() else surface
+
+
+# Rounded button face with centred label
+def button_face(size, color, text_surface, border_radius=12):
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    pygame.draw.rect(surface, color, surface.get_rect(), border_radius=border_radius)
+    surface.blit(text_surface, text_surface.get_rect(center=surface.get_rect().center))
+    return surface
@@ -0,0 +1,40 @@
+# Startup timing marks for the dashboard.
+# mark() records the time since this module was imported (the first import in
+# mimosafinal.py); report() prints the marks when MIMOSA_STARTUP_REPORT is set:
+#
+#   MIMOSA_STARTUP_REPORT=1 python mimosafinal.py
+#
+# If a mark regresses, `python -X importtime mimosafinal.py` shows which
+# module import is responsible.
+import os
+import sys
+import time
+
+ENV_VAR = "MIMOSA_STARTUP_REPORT"
+
+
+class StartupTimer:
+    def __init__(self, enabled=None, clock=time.perf_counter):
+        self.enabled = bool(os.environ.get(ENV_VAR)) if enabled is None else enabled
+        self.clock = clock
+        self.started = clock()
+        self.marks = []  # (name, seconds since start)
+
+    def mark(self, name):
+        self.marks.append((name, self.clock() - self.started))
+
+    def elapsed(self, name):
+        for mark, seconds in self.marks:
+            if mark == name:
+                return seconds
+        return None
+
+    def report(self, file=None):
+        if not self.enabled:
+            return
+        file = file or sys.stderr
+        print("Startup report:", file=file)
+        previous = 0.0
+        for name, seconds in self.marks:
+            print(f"  {seconds * 1000:8.1f} ms  (+{(seconds - previous) * 1000:7.1f} ms)  {name}", file=file)
+            previous = seconds
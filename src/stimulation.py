@@ -0,0 +1,160 @@
+# Automatic vibrator scheduling for plant sections.
+# Each section of plants has one vibrator. Firing it closes the section's
+# plants, which pays back a spike whose size depends on how far the plants
+# have recovered since they last reopened, and costs the vibrator's draw for
+# the length of the pulse. The scheduler fires every section at the interval
+# that maximises net energy per second and staggers the sections evenly
+# across that interval, so the vibrator load stays flat instead of every
+# section firing on the same tick.
+#
+# What a spike pays back comes from the engine's own reading model
+# (pulse_gain); if it does not beat the resting reading the scheduler stays
+# off. The energy the plants actually return is measured from the engine
+# every step, so net is what the pulses changed, not what was predicted.
+#
+# Pending firings live in a timer wheel with one slot per simulation step:
+# a step only looks at the sections due in its slot, so the cost per step is
+# proportional to the sections fired, not to the number of plants.
+import numpy as np
+
+VIBRATOR_POWER = 0.1e-6  # W per plant while the vibrator runs (README: 0.1 µW per plant)
+PULSE_SECONDS = 0.05     # Length of one vibrator pulse
+RECOVERY_TIME = 300.0    # Seconds for a reopened plant to recover (1 - 1/e) of its response
+SECTION_SIZE = 4         # Plants per vibrator (one greenhouse section)
+_NONE = np.empty(0, dtype=np.intp)  # No plants pulsed this step
+
+
+# Firing interval in seconds that maximises net energy per second for one
+# plant, or inf if firing never pays for the vibrator
+def optimal_interval(gain, cost, refractory_time, recovery_time, max_interval=3600.0):
+    intervals = np.geomspace(refractory_time + 1e-3, max_interval, 4096)
+    response = 1 - np.exp(-(intervals - refractory_time) / recovery_time)
+    net_rate = (gain * response - cost) / intervals
+    best = int(np.argmax(net_rate))
+    return float(intervals[best]) if net_rate[best] > 0 else np.inf
+
+
+# J one fully recovered plant returns per pulse over its resting output, from
+# the engine's reading model: with a spike kernel the area of its spike (the
+# resting reading is unchanged), otherwise its closed reading held for the
+# refractory time in place of the mean resting reading, which loses energy
+# whenever touch_energy is below that mean
+def pulse_gain(engine):
+    if engine.spikes is not None:
+        return engine.touch_energy * engine.spikes.kernel.area * 1e-6
+    resting = (engine.baseline + engine.spike) / 2
+    return (engine.touch_energy - resting) * engine.refractory_time * 1e-6
+
+
+class TimerWheel:
+    def __init__(self, slots):
+        self.slots = [[] for _ in range(slots)]  # Each slot holds arrays of ids
+        self.tick = 0
+        self.pending = 0
+
+    # Schedule ids delay ticks ahead (1 <= delay < len(slots)); delay may be per id
+    def schedule(self, ids, delay):
+        ids = np.atleast_1d(ids)
+        delay = np.broadcast_to(delay, ids.shape)
+        if ids.size == 0:
+            return
+        n = len(self.slots)
+        for d in np.unique(delay).tolist():
+            self.slots[(self.tick + d) % n].append(ids[delay == d])
+        self.pending += ids.size
+
+    # Move to the next tick and return the ids due on it
+    def advance(self):
+        self.tick += 1
+        slot = self.slots[self.tick % len(self.slots)]
+        if not slot:
+            return np.empty(0, dtype=np.intp)
+        due = slot[0] if len(slot) == 1 else np.concatenate(slot)
+        slot.clear()
+        self.pending -= due.size
+        return due
+
+
+class StimulationScheduler:
+    def __init__(self, engine, start, stop, dt, section_size=SECTION_SIZE, vibrator_power=VIBRATOR_POWER,
+                 pulse=PULSE_SECONDS, recovery_time=RECOVERY_TIME, gain=None, interval=None):
+        self.engine = engine
+        self.start = start  # Engine slice driven by the vibrators
+        self.stop = stop
+        self.dt = dt
+        self.section_size = section_size
+        self.section_starts = np.arange(start, stop, section_size)
+        self.sections = self.section_starts.size
+        self.vibrator_power = vibrator_power
+        self.pulse = pulse
+        self.recovery_time = recovery_time
+        self.gain = pulse_gain(engine) if gain is None else gain  # J per fully recovered plant
+        self.cost = vibrator_power * pulse  # J per plant per pulse
+        if interval is None:
+            interval = optimal_interval(self.gain, self.cost, engine.refractory_time, recovery_time)
+        self.interval = interval
+        self.enabled = self.gain > 0 and np.isfinite(interval)
+        self.interval_ticks = max(1, int(round(interval / dt))) if self.enabled else 1
+        self.retry_ticks = max(1, int(np.ceil(engine.refractory_time / dt)))
+        self.wheel = TimerWheel(max(self.interval_ticks, self.retry_ticks) + 1)
+        self.last_fired = np.full(self.sections, -np.inf)
+        self.fired = 0       # Section pulses so far
+        self.spent = 0.0     # J used by the vibrators
+        self.expected = 0.0  # J the pulses are expected to return (from gain)
+        self.returned = 0.0  # J the stimulated plants gave above rest, measured each step
+        if self.enabled:
+            # Evenly staggered first firings: about sections / interval_ticks per step
+            self.wheel.schedule(np.arange(self.sections),
+                                1 + np.arange(self.sections) * self.interval_ticks // self.sections)
+
+    # Fire the sections due this step. Returns the indices of the plants
+    # pulsed; each cost self.cost J.
+    def step(self):
+        if self.enabled:
+            self.returned += self._excess_power() * self.dt
+        due = self.wheel.advance()
+        if due.size == 0:
+            return _NONE
+        engine = self.engine
+        plants = self.section_starts[due, None] + np.arange(self.section_size)
+        inside = plants < self.stop  # The last section may be partial
+        # Sections with a plant still closed (e.g. touched by hand) are retried
+        # once they can have reopened rather than wasting a pulse
+        if engine.closed_count:
+            busy = (engine.closed[np.where(inside, plants, self.start)] & inside).any(axis=1)
+            if busy.any():
+                self.wheel.schedule(due[busy], self.retry_ticks)
+                due, plants, inside = due[~busy], plants[~busy], inside[~busy]
+                if due.size == 0:
+                    return _NONE
+        since_open = engine.time - self.last_fired[due] - engine.refractory_time
+        response = 1 - np.exp(-np.maximum(since_open, 0) / self.recovery_time)  # 1 for never fired
+        per_plant = np.broadcast_to(response[:, None], plants.shape)[inside]
+        plants = plants[inside]
+        engine.touch_indices(plants, engine.touch_energy * per_plant)
+        self.last_fired[due] = engine.time
+        self.wheel.schedule(due, self.interval_ticks)
+        spent = self.cost * plants.size
+        self.fired += due.size
+        self.spent += spent
+        self.expected += self.gain * float(per_plant.sum())
+        return plants
+
+    # W the stimulated plants give above rest right now: their live spikes
+    # with a kernel, else their closed readings minus the mean resting reading.
+    # Touches by hand in the range count too; the engine cannot tell them apart.
+    def _excess_power(self):
+        engine = self.engine
+        if engine.spikes is not None:
+            return engine.spikes.energy(engine.time, self.start, self.stop) * 1e-6
+        if engine.closed_count == 0:
+            return 0.0
+        closed = engine.closed[self.start:self.stop]
+        resting = (engine.baseline + engine.spike) / 2
+        excess = engine.amplitude[self.start:self.stop][closed].sum(dtype=np.float64) - resting * closed.sum()
+        return float(excess) * 1e-6
+
+    # Measured net energy in J so far: energy returned minus vibrator energy
+    @property
+    def net(self):
+        return self.returned - self.spent
@@ -0,0 +1,135 @@
+# Monte Carlo scenario sweep over the headless simulation.
+# Draws random scenarios from parameter ranges, runs each one with
+# simulate.run_simulation in a process pool and reports the distribution of
+# delivered energy and final battery state. Scenarios and per-run seeds are
+# derived from one master seed in the parent process, so the results do not
+# depend on the number of workers.
+#
+#   python sweep.py --runs 2000 --plants 100:1000 --efficiency 0.3:0.6 --duration 1h --seed 7
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import simulate
+
+PERCENTILES = (5, 25, 50, 75, 95)
+RESULT_FIELDS = ("harvested_j", "net_j", "mean_power_w", "battery_final_pct", "battery_min_pct")
+
+
+# "0.3:0.6" -> (0.3, 0.6); a single value is a fixed parameter
+def parse_range(text):
+    low, _, high = text.partition(":")
+    low = float(low)
+    return low, float(high) if high else low
+
+
+# Draw every scenario up front from the master seed
+def draw_scenarios(args):
+    master = np.random.SeedSequence(args.seed)
+    params_seed, *run_seeds = master.spawn(args.runs + 1)
+    rng = np.random.default_rng(params_seed)
+    low, high = args.plants
+    plants = rng.integers(int(low), int(high) + 1, args.runs)
+    efficiency = rng.uniform(*args.efficiency, args.runs)
+    stimulation = rng.uniform(*args.stimulation_power, args.runs)
+    capacity = rng.uniform(*args.battery_capacity, args.runs)
+    return [
+        {"plants": int(plants[i]), "efficiency": float(efficiency[i]),
+         "stimulation_power": float(stimulation[i]), "battery_capacity": float(capacity[i]),
+         "seed": run_seeds[i]}
+        for i in range(args.runs)
+    ]
+
+
+# Executed in a worker process
+def run_scenario(scenario, duration, dt, touch_rate):
+    # Children derived without spawn(), which would advance the scenario's own
+    # SeedSequence and give a different run each time a scenario is reused
+    seed = scenario["seed"]
+    engine_seed, touch_seed = (np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key + (i,))
+                               for i in range(2))
+    worker = simulate.build_worker(scenario["plants"], dt, battery_capacity=scenario["battery_capacity"],
+                                   efficiency=scenario["efficiency"],
+                                   stimulation_power=scenario["stimulation_power"], seed=engine_seed)
+    summary, _ = simulate.run_simulation(worker, duration, touch_rate, seed=touch_seed)
+    return tuple(summary[field] for field in RESULT_FIELDS)
+
+
+def _run_chunk(chunk, duration, dt, touch_rate):
+    return [run_scenario(scenario, duration, dt, touch_rate) for scenario in chunk]
+
+
+def run_sweep(scenarios, duration, dt=1.0, touch_rate=simulate.TOUCHES_PER_HOUR, workers=None):
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return np.array(_run_chunk(scenarios, duration, dt, touch_rate))
+    # Contiguous chunks keep the result order and amortise the pickling overhead
+    chunk_size = max(1, len(scenarios) // (workers * 4))
+    chunks = [scenarios[i:i + chunk_size] for i in range(0, len(scenarios), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_chunk, chunk, duration, dt, touch_rate) for chunk in chunks]
+        results = [row for future in futures for row in future.result()]
+    return np.array(results)
+
+
+def summarize(results):
+    percentiles = np.percentile(results, PERCENTILES, axis=0)
+    rows = []
+    for column, field in enumerate(RESULT_FIELDS):
+        values = results[:, column]
+        rows.append((field, values.mean(), values.std(), *percentiles[:, column]))
+    return rows
+
+
+def write_results(path, scenarios, results):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["plants", "efficiency", "stimulation_power", "battery_capacity", *RESULT_FIELDS])
+        for scenario, row in zip(scenarios, results.tolist()):
+            writer.writerow([scenario["plants"], scenario["efficiency"], scenario["stimulation_power"],
+                             scenario["battery_capacity"], *row])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo sweep of the Mimosa energy model.")
+    parser.add_argument("--runs", type=int, default=1000, help="number of scenarios (default: 1000)")
+    parser.add_argument("--plants", type=parse_range, default=(100, 1000), help="plant count range, e.g. 100:1000")
+    parser.add_argument("--efficiency", type=parse_range, default=(0.3, 0.6),
+                        help="conversion efficiency range (default: 0.3:0.6)")
+    parser.add_argument("--stimulation-power", type=parse_range, default=(0.05e-6, 0.15e-6),
+                        help="vibrator power per plant in W (default: 5e-8:1.5e-7)")
+    parser.add_argument("--battery-capacity", type=parse_range, default=(0.5, 5.0),
+                        help="battery capacity range in J (default: 0.5:5)")
+    parser.add_argument("--duration", type=simulate.parse_duration, default=simulate.parse_duration("1h"),
+                        help="simulated time per run (default: 1h)")
+    parser.add_argument("--dt", type=float, default=1.0, help="time step in seconds (default: 1)")
+    parser.add_argument("--touch-rate", type=float, default=simulate.TOUCHES_PER_HOUR,
+                        help="touches per plant per hour (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0, help="master seed (default: 0)")
+    parser.add_argument("--output", help="write one CSV row per scenario to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scenarios = draw_scenarios(args)
+    started = time.perf_counter()
+    results = run_sweep(scenarios, args.duration, args.dt, args.touch_rate, args.workers)
+    elapsed = time.perf_counter() - started
+    print(f"{args.runs} runs of {args.duration:g} s in {elapsed:.2f} s "
+          f"({args.runs / elapsed:.1f} runs/s, {args.workers or os.cpu_count()} workers)")
+    header = "".join(f"{'p' + str(p):>12}" for p in PERCENTILES)
+    print(f"{'metric':>18}{'mean':>12}{'std':>12}{header}")
+    for field, mean, std, *pct in summarize(results):
+        print(f"{field:>18}{mean:12.4g}{std:12.4g}" + "".join(f"{value:12.4g}" for value in pct))
+    if args.output:
+        write_results(args.output, scenarios, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())